@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from loguru import logger
+
+from eightify.config import config
+
+T = TypeVar("T")
+
+
+class CassetteMode(str, Enum):
+    OFF = "off"
+    RECORD = "record"  # call the real upstream and save the request/response pair
+    REPLAY = "replay"  # answer from saved pairs only, never touch the network
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when there's no recording for a request."""
+
+
+class RecordedError(RuntimeError):
+    """Replays an exception the upstream raised while recording."""
+
+
+class Cassette:
+    """
+    Record/replay layer under the calls to YouTube and the LLM.
+
+    Every interaction is a JSON file `<directory>/<kind>/<hash of the request>.json` with the request,
+    the response (or the error) and how long the call took. Replay is deterministic: the same request always gets
+    the same recorded response, optionally after sleeping for the recorded duration to reproduce the latency.
+    """
+
+    def __init__(self, directory: str | Path, mode: CassetteMode, replay_latency: bool = False):
+        self.directory = Path(directory)
+        self.mode = mode
+        self.replay_latency = replay_latency
+
+    def call(
+        self,
+        kind: str,
+        request: dict,
+        func: Callable[..., T],
+        *args,
+        serialize: Callable[[T], Any] = lambda response: response,
+        deserialize: Callable[[Any], T] = lambda data: data,
+        **kwargs,
+    ) -> T:
+        if self.mode == CassetteMode.OFF:
+            return func(*args, **kwargs)
+
+        path = self.directory / kind / f"{request_hash(request)}.json"
+        if self.mode == CassetteMode.REPLAY:
+            return self._replay(path, deserialize)
+
+        started_at = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+        except Exception as e:
+            self._save(path, request, time.perf_counter() - started_at, error=f"{type(e).__name__}: {e}")
+            raise
+        self._save(path, request, time.perf_counter() - started_at, response=serialize(response))
+        return response
+
+    def placeholder_key(self, api_key: str) -> str:
+        """
+        API clients refuse to be created without a key, at import time. Replays and offline tests don't need
+        a real one, and live calls with the placeholder fail with an authentication error instead.
+        """
+        return api_key or "missing"
+
+    def _replay(self, path: Path, deserialize: Callable[[Any], T]) -> T:
+        if not path.exists():
+            raise CassetteMiss(f"No recording at {path}, record it with CASSETTE_MODE=record")
+
+        interaction = json.loads(path.read_text())
+        if self.replay_latency:
+            time.sleep(interaction["duration"])
+        if interaction["error"] is not None:
+            raise RecordedError(interaction["error"])
+        return deserialize(interaction["response"])
+
+    def _save(self, path: Path, request: dict, duration: float, response: Any = None, error: str | None = None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        interaction = {"request": request, "response": response, "error": error, "duration": round(duration, 4)}
+        path.write_text(json.dumps(interaction, indent=2, ensure_ascii=False, default=str))
+        logger.debug(f"Recorded {path}")
+
+
+def request_hash(request: dict) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+
+def strip_api_key(uri: str) -> str:
+    """
+    Recordings are committed to the repo, keep the API key out of them.
+    """
+    parts = urlsplit(uri)
+    query = urlencode([(name, value) for name, value in parse_qsl(parts.query) if name != "key"])
+    return urlunsplit(parts._replace(query=query))
+
+
+cassette = Cassette(config.cassette_dir, CassetteMode(config.cassette_mode), config.cassette_replay_latency)
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, TypeVar
+
+from loguru import logger
+
+from eightify.config import config
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast once an upstream's error rate crosses a threshold.
+
+    The breaker keeps the outcomes of the last `window` calls. When at least `min_calls` of them are known
+    and the failure ratio reaches `failure_threshold`, the circuit opens and every call is rejected with
+    `CircuitOpenError` for `recovery_timeout` seconds. After that a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+
+    Exceptions listed in `excluded_exceptions` are expected answers from a healthy upstream
+    (e.g. "this video has no transcript") and don't count as failures.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: float = config.circuit_failure_threshold,
+        window: int = config.circuit_window,
+        min_calls: int = config.circuit_min_calls,
+        recovery_timeout: float = config.circuit_recovery_timeout,
+        excluded_exceptions: tuple[type[BaseException], ...] = (),
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.recovery_timeout = recovery_timeout
+        self.excluded_exceptions = excluded_exceptions
+
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None and time.monotonic() - self._opened_at < self.recovery_timeout
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except self.excluded_exceptions:
+            self._record(success=True)
+            raise
+        except Exception:
+            self._record(success=False)
+            raise
+        self._record(success=True)
+        return result
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.recovery_timeout or self._trial_in_flight:
+                raise CircuitOpenError(f"Circuit '{self.name}' is open, failing fast")
+            # Half-open: let a single trial call through
+            self._trial_in_flight = True
+
+    def _record(self, success: bool) -> None:
+        with self._lock:
+            if self._trial_in_flight:
+                self._trial_in_flight = False
+                if success:
+                    logger.info(f"Circuit '{self.name}' closed after a successful trial call")
+                    self._opened_at = None
+                    self._outcomes.clear()
+                else:
+                    logger.warning(f"Circuit '{self.name}' trial call failed, staying open")
+                    self._opened_at = time.monotonic()
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                self._opened_at is None
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_threshold
+            ):
+                logger.warning(f"Circuit '{self.name}' opened: {failures}/{len(self._outcomes)} recent calls failed")
+                self._opened_at = time.monotonic()
@@ -1,2 +1,5 @@
-from .comments import analyze_and_cluster_comments
-from .summary import summarize_text
+from .chapters import summarize_chapters
+from .comments import analyze_and_cluster_comments, focus_comment_analysis
+from .rollup import rollup_summaries
+from .scheduler import Priority
+from .summary import merge_summaries, summarize_text
@@ -1,12 +1,13 @@
 from typing import TypedDict
 
 from loguru import logger
-from openai import OpenAI
+from openai.types.chat import ChatCompletion
 
+from eightify.api.cassette import cassette
+from eightify.api.llm.providers import llm_router
+from eightify.api.llm.scheduler import Priority, llm_scheduler
 from eightify.config import config
 
-client = OpenAI(api_key=config.openai_api_key.get_secret_value())
-
 
 def create_system_prompt() -> str:
     """
@@ -58,14 +59,30 @@ def create_system_prompt() -> str:
     """
 
 
-def get_llm_response(system_prompt: str, user_prompt: str, function_schema: TypedDict) -> str | None:
+def get_llm_response(
+    system_prompt: str,
+    user_prompt: str,
+    function_schema: TypedDict,
+    priority: Priority = Priority.INTERACTIVE,
+    model: str | None = None,
+) -> str | None:
     try:
-        response = client.chat.completions.create(
-            model=config.llm_model,
+        request = dict(
+            model=model or config.llm_model,
             messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
             functions=[function_schema],
             function_call={"name": function_schema["name"]},
         )
+        with llm_scheduler.slot(priority, timeout=config.llm_queue_timeout):
+            # Recorded by the requested model, whichever provider ends up answering
+            response = cassette.call(
+                "llm",
+                request,
+                llm_router.create,
+                request,
+                serialize=lambda completion: completion.model_dump(mode="json"),
+                deserialize=ChatCompletion.model_validate,
+            )
         response = response.choices[0].message.function_call.arguments
     except Exception as e:
         logger.error(f"Error in get_llm_response: {str(e)}")
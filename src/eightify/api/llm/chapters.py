@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from eightify.api.llm.scheduler import Priority
+from eightify.api.llm.summary import merge_summaries, summarize_text
+from eightify.chapters import format_timestamp, slice_transcript
+from eightify.common import ChapterSummary, VideoChapter, VideoDetails, VideoTranscript
+from eightify.config import config
+
+
+def summarize_chapters(
+    transcript: VideoTranscript,
+    video_details: VideoDetails,
+    chapters: list[VideoChapter],
+    priority: Priority = Priority.INTERACTIVE,
+) -> tuple[str, list[ChapterSummary], list[VideoChapter]] | None:
+    """
+    Summarize every chapter concurrently, then roll the chapter summaries up into an overall one.
+
+    Returns the formatted text (overall summary followed by timestamped chapters), the per-chapter summaries
+    and the chapters whose summary failed. Chapters without speech are left out, they have nothing to summarize.
+    """
+    chapter_transcripts = slice_transcript(transcript, chapters)
+
+    def summarize_chapter(chapter: VideoChapter, chapter_transcript: VideoTranscript) -> str | None:
+        if not chapter_transcript.text:
+            return ""
+        return summarize_text(
+            transcript=chapter_transcript,
+            video_title=f"{video_details.title} — chapter: {chapter.title}",
+            video_description=video_details.description,
+            priority=priority,
+            max_points=config.chapter_max_points,
+            heading=None,
+        )
+
+    with ThreadPoolExecutor(max_workers=config.chapter_summary_concurrency) as executor:
+        summaries = list(executor.map(summarize_chapter, chapters, chapter_transcripts))
+
+    chapter_summaries = [
+        ChapterSummary(chapter=chapter, summary=summary) for chapter, summary in zip(chapters, summaries) if summary
+    ]
+    failed = [chapter for chapter, summary in zip(chapters, summaries) if summary is None]
+    if not chapter_summaries:
+        logger.error(f"Failed to summarize any of {len(chapters)} chapters")
+        return None
+    if failed:
+        logger.warning(f"Failed to summarize {len(failed)} of {len(chapters)} chapters")
+
+    overall = merge_summaries(
+        [summary.summary for summary in chapter_summaries],
+        title=video_details.title,
+        description=video_details.description,
+        priority=priority,
+    )
+    if overall is None:
+        return None
+
+    # The failed chapters stay in their place, so it's clear the overall summary is missing them
+    formatted_chapters = "\n\n".join(
+        f"**[{format_timestamp(chapter.start)}] {chapter.title}**\n\n"
+        + ("_Couldn't summarize this chapter, try again later._" if summary is None else summary)
+        for chapter, summary in zip(chapters, summaries)
+        if summary != ""
+    )
+    return f"{overall}\n\n**Chapters**\n\n{formatted_chapters}", chapter_summaries, failed
@@ -3,8 +3,37 @@ import json
 from loguru import logger
 
 from eightify.api.llm.base import create_system_prompt, get_llm_response, log_prompt
+from eightify.api.llm.scheduler import Priority
 from eightify.common import CommentAnalysis, CommentTopic, VideoComment, VideoDetails
 from eightify.config import config
+from eightify.insight import content_words
+
+COMMENT_ANALYSIS_FUNCTION_SCHEMA = {
+    "name": "analyze_and_cluster_comments",
+    "description": "Analyze YouTube video comments, generate topics, and assign comments to topics",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "topics": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "description": {"type": "string"},
+                        "comment_indices": {"type": "array", "items": {"type": "integer"}},
+                    },
+                    "required": ["name", "description", "comment_indices"],
+                },
+            },
+            "overall_analysis": {
+                "type": "string",
+                "description": "Overall analysis of the comments and topics",
+            },
+        },
+        "required": ["topics", "overall_analysis"],
+    },
+}
 
 
 def create_comment_analysis_prompt(
@@ -72,6 +101,7 @@ def analyze_and_cluster_comments(
     video_details: VideoDetails,
     summary: str | None = None,
     insight_request: str | None = None,
+    priority: Priority = Priority.COMMENTS,
 ) -> CommentAnalysis | None:
     """
     Analyze YouTube video comments, generate topics, and assign comments to topics.
@@ -90,35 +120,70 @@ def analyze_and_cluster_comments(
 
     log_prompt(user_prompt, "analyze_and_cluster_comments")
 
-    function_schema = {
-        "name": "analyze_and_cluster_comments",
-        "description": "Analyze YouTube video comments, generate topics, and assign comments to topics",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "topics": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": {"type": "string"},
-                            "description": {"type": "string"},
-                            "comment_indices": {"type": "array", "items": {"type": "integer"}},
-                        },
-                        "required": ["name", "description", "comment_indices"],
-                    },
-                },
-                "overall_analysis": {
-                    "type": "string",
-                    "description": "Overall analysis of the comments and topics",
-                },
-            },
-            "required": ["topics", "overall_analysis"],
-        },
-    }
+    response = get_llm_response(system_prompt, user_prompt, COMMENT_ANALYSIS_FUNCTION_SCHEMA, priority)
+    return parse_comment_analysis(response, comments)
+
+
+def create_focus_prompt(
+    video_details: VideoDetails, analysis: CommentAnalysis, insight_request: str, comment_indices: list[int]
+) -> str:
+    topics = "\n".join(
+        f"- {topic.name}: {topic.description} (comments {', '.join(map(str, topic.comment_indices))})"
+        for topic in analysis.topics
+    )
+    return f"""
+    The comments of the following YouTube video have already been analyzed and grouped into topics:
+    Title: {video_details.title}
+
+    Topics:
+    {topics}
+
+    Overall analysis: {analysis.overall_analysis}
+
+    The user wants to know about: {insight_request}
+
+    Your task:
+    1. Keep or rewrite the topics that are relevant to what the user wants to know, drop the rest.
+    2. Add up to {config.max_number_of_topics} new topics if the comments below answer the question
+       and the existing topics don't cover it.
+    3. Write a short, simple TLDR that answers the user's question from the comments.
+       If the comments don't talk about it, say so.
+
+    Comments:
+    {" ".join(f"Comment {i}: {analysis.comments[i].text}" for i in comment_indices)}
+
+    Use the same comment numbers in comment_indices.
+    """
+
+
+def focus_comment_analysis(
+    analysis: CommentAnalysis,
+    video_details: VideoDetails,
+    insight_request: str,
+    priority: Priority = Priority.COMMENTS,
+    model: str | None = config.insight_llm_model,
+) -> CommentAnalysis | None:
+    """
+    Answer an insight request from an existing request-independent analysis.
+
+    Only the topics and the comments that may matter are sent (the ones already assigned to a topic plus
+    the ones sharing a word with the request): much cheaper than a new full analysis.
+    """
+    request_words = content_words(insight_request)
+    assigned = {i for topic in analysis.topics for i in topic.comment_indices}
+    comment_indices = [
+        i for i, comment in enumerate(analysis.comments) if i in assigned or request_words & content_words(comment.text)
+    ]
+
+    system_prompt = create_system_prompt()
+    user_prompt = create_focus_prompt(video_details, analysis, insight_request, comment_indices)
+    log_prompt(user_prompt, "focus_comment_analysis")
+
+    response = get_llm_response(system_prompt, user_prompt, COMMENT_ANALYSIS_FUNCTION_SCHEMA, priority, model)
+    return parse_comment_analysis(response, analysis.comments)
 
-    response = get_llm_response(system_prompt, user_prompt, function_schema)
 
+def parse_comment_analysis(response: str | None, comments: list[VideoComment]) -> CommentAnalysis | None:
     if response:
         try:
             analysis_data = json.loads(response)
@@ -129,7 +194,8 @@ def analyze_and_cluster_comments(
                     CommentTopic(
                         name=topic["name"],
                         description=topic["description"],
-                        comment_indices=topic["comment_indices"],
+                        # The model occasionally makes up an index
+                        comment_indices=[i for i in topic["comment_indices"] if 0 <= i < len(comments)],
                     )
                     for topic in analysis_data["topics"]
                 ],
@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+
+from loguru import logger
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+
+from eightify.api.cassette import cassette
+from eightify.api.circuit_breaker import CircuitBreaker, CircuitOpenError
+from eightify.config import LLMProviderSettings, config
+from eightify.utils import estimate_tokens
+
+# Room left in the context window for the function call arguments
+OUTPUT_TOKEN_RESERVE = 4096
+
+
+class LLMProvider:
+    """
+    One OpenAI-compatible endpoint with its own circuit breaker and running averages (EWMA)
+    of its latency and error rate.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client: OpenAI,
+        model: str | None = None,
+        function_calling: bool = True,
+        max_context_tokens: int = 128_000,
+        alpha: float = config.llm_ewma_alpha,
+    ):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.function_calling = function_calling
+        self.max_context_tokens = max_context_tokens
+        self.alpha = alpha
+        self.breaker = CircuitBreaker(f"llm:{name}")
+
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.last_called_at: float | None = None
+        self._lock = threading.Lock()
+
+    def create(self, request: dict) -> ChatCompletion:
+        with self._lock:
+            self.last_called_at = time.monotonic()
+        started_at = time.perf_counter()
+        try:
+            response = self.breaker.call(
+                self.client.chat.completions.create, **{**request, "model": self.model or request["model"]}
+            )
+        except CircuitOpenError:
+            raise
+        except Exception:
+            self._record(success=False)
+            raise
+        self._record(success=True, latency=time.perf_counter() - started_at)
+        return response
+
+    def fits(self, prompt_tokens: int) -> bool:
+        return self.function_calling and prompt_tokens + OUTPUT_TOKEN_RESERVE <= self.max_context_tokens
+
+    def probe_due(self, probe_interval: float) -> bool:
+        """
+        True when the provider hasn't been called for `probe_interval`, so its averages may be out of date.
+        """
+        with self._lock:
+            return self.last_called_at is None or time.monotonic() - self.last_called_at > probe_interval
+
+    def expected_latency(self, probe_interval: float) -> float:
+        """
+        Latency to rank the provider by. Unmeasured and long unused providers rank first: that's how
+        a new provider gets measured and a slow one gets noticed when it's fast again.
+        """
+        if self.latency is None or self.probe_due(probe_interval):
+            return 0.0
+        return self.latency
+
+    def _record(self, success: bool, latency: float | None = None) -> None:
+        with self._lock:
+            self.calls += 1
+            self.error_rate += self.alpha * ((0.0 if success else 1.0) - self.error_rate)
+            if latency is not None:
+                self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "latency": self.latency,
+                "error_rate": round(self.error_rate, 3),
+                "calls": self.calls,
+                "circuit_open": self.breaker.is_open,
+            }
+
+
+class LLMRouter:
+    """
+    Sends each call to the fastest healthy provider able to take it, failing over to the next one on errors.
+
+    A provider can take a call if it supports function calling and the prompt fits its context window.
+    Healthy ones (error rate under `max_error_rate`) are tried by expected latency, then the unhealthy ones;
+    providers with an open circuit are skipped. An unhealthy provider unused for `probe_interval` counts as
+    healthy for one call: its error rate only changes when it's called, so that's how a recovered one comes back.
+    """
+
+    def __init__(
+        self,
+        providers: list[LLMProvider],
+        max_error_rate: float = config.llm_provider_max_error_rate,
+        probe_interval: float = config.llm_provider_probe_interval,
+    ):
+        self.providers = providers
+        self.max_error_rate = max_error_rate
+        self.probe_interval = probe_interval
+
+    @property
+    def is_open(self) -> bool:
+        """
+        True when every provider's circuit is open, i.e. there's nowhere to send a call.
+        """
+        return all(provider.breaker.is_open for provider in self.providers)
+
+    def candidates(self, prompt_tokens: int) -> list[LLMProvider]:
+        available = [
+            provider for provider in self.providers if provider.fits(prompt_tokens) and not provider.breaker.is_open
+        ]
+        return sorted(
+            available,
+            key=lambda provider: (
+                provider.error_rate >= self.max_error_rate and not provider.probe_due(self.probe_interval),
+                provider.expected_latency(self.probe_interval),
+            ),
+        )
+
+    def create(self, request: dict) -> ChatCompletion:
+        prompt_tokens = estimate_tokens(json.dumps(request["messages"]) + json.dumps(request.get("functions", [])))
+        candidates = self.candidates(prompt_tokens)
+        if not candidates:
+            raise CircuitOpenError(f"No LLM provider available for a prompt of ~{prompt_tokens} tokens")
+
+        for i, provider in enumerate(candidates):
+            try:
+                return provider.create(request)
+            except Exception as e:
+                if i == len(candidates) - 1:
+                    raise
+                logger.warning(f"LLM provider {provider.name} failed ({e}), failing over to {candidates[i + 1].name}")
+
+    def stats(self) -> dict:
+        return {provider.name: provider.stats() for provider in self.providers}
+
+
+def create_provider(settings: LLMProviderSettings) -> LLMProvider:
+    client = OpenAI(
+        base_url=settings.base_url,
+        # Local servers usually don't check the key
+        api_key=cassette.placeholder_key(settings.api_key.get_secret_value()),
+        timeout=config.llm_timeout,
+        max_retries=settings.max_retries,
+    )
+    return LLMProvider(
+        settings.name,
+        client,
+        model=settings.model,
+        function_calling=settings.function_calling,
+        max_context_tokens=settings.max_context_tokens,
+    )
+
+
+def create_default_providers() -> list[LLMProvider]:
+    if config.llm_providers:
+        return [create_provider(settings) for settings in config.llm_providers]
+
+    client = OpenAI(
+        api_key=cassette.placeholder_key(config.openai_api_key.get_secret_value()), timeout=config.llm_timeout
+    )
+    return [LLMProvider("openai", client)]
+
+
+llm_router = LLMRouter(create_default_providers())
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from loguru import logger
+
+from eightify.api.llm.scheduler import Priority
+from eightify.api.llm.summary import merge_summaries
+from eightify.config import config
+
+
+def rollup_summaries(
+    summaries: list[str],
+    title: str,
+    video_titles: list[str],
+    priority: Priority = Priority.ROLLUP,
+    fanout: int = config.rollup_fanout,
+) -> tuple[str | None, list[int]]:
+    """
+    Reduce any number of summaries to one through a tree of merge calls.
+
+    Each level merges groups of `fanout` summaries concurrently, so no prompt holds more than `fanout` summaries
+    and the number of sequential LLM calls grows with log(len(summaries)) instead of len(summaries).
+    Each merge is only told the titles of the videos its group covers, so below the root the prompts don't grow
+    with the number of videos either.
+    A failed merge drops its group rather than the whole roll-up. Returns the roll-up and the indices
+    of the summaries that made it in.
+    """
+    if fanout < 2:
+        raise ValueError(f"Roll-up fanout must be at least 2, got {fanout}")
+
+    # Every node of the tree is a summary and the inputs it covers
+    level = [(summary, [i]) for i, summary in enumerate(summaries)]
+    depth = 0
+    while len(level) > 1:
+        groups = [level[i : i + fanout] for i in range(0, len(level), fanout)]
+        is_last = len(groups) == 1
+
+        def merge(group: list[tuple[str, list[int]]]) -> tuple[str, list[int]] | None:
+            if len(group) == 1:
+                return group[0]
+            covered = [i for _, indices in group for i in indices]
+            summary = merge_summaries(
+                [summary for summary, _ in group],
+                title,
+                "Videos:\n" + "\n".join(f"- {video_titles[i]}" for i in covered),
+                priority=priority,
+                heading="Key Points" if is_last else None,
+            )
+            if summary is None:
+                return None
+            return summary, covered
+
+        with ThreadPoolExecutor(max_workers=config.rollup_concurrency) as executor:
+            merged = list(executor.map(merge, groups))
+
+        depth += 1
+        failed = merged.count(None)
+        if failed:
+            logger.warning(f"Roll-up level {depth}: {failed} of {len(groups)} merges failed")
+        level = [node for node in merged if node is not None]
+
+    logger.debug(f"Rolled up {len(summaries)} summaries in {depth} levels")
+    if not level:
+        return None, []
+    summary, indices = level[0]
+    return summary, indices
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Iterator
+
+from loguru import logger
+
+from eightify.config import config
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"  # user is waiting for /summarize
+    COMMENTS = "comments"  # comment analysis, requested by a user after the summary
+    ROLLUP = "rollup"  # playlist/channel roll-ups: a user is waiting, but for dozens of calls
+    BACKGROUND = "background"  # revalidation, warm-up and other bulk work
+
+
+class SchedulerTimeout(TimeoutError):
+    """Raised when an LLM call waited in the queue for longer than allowed."""
+
+
+@dataclass
+class _Ticket:
+    priority: Priority
+    tag: float
+    enqueued_at: float = field(default_factory=time.monotonic)
+    granted: bool = False
+
+
+@dataclass
+class _ClassState:
+    weight: float
+    max_concurrency: int
+    queue: deque[_Ticket] = field(default_factory=deque)
+    in_flight: int = 0
+    last_finish_tag: float = 0.0
+    completed: int = 0
+    timed_out: int = 0
+    avg_wait: float = 0.0
+
+
+class LLMScheduler:
+    """
+    Shares the LLM rate limit between priority classes with weighted fair queuing.
+
+    Every call takes a slot before hitting the API. There are `max_concurrency` slots in total, and each class
+    has its own cap on how many of them it may hold at once. When a slot frees up, the queued call with the smallest
+    virtual finish tag gets it: a class with weight 6 gets ~6 slots for every slot of a class with weight 1 under
+    contention, while an idle class doesn't block anyone — bulk work soaks up all spare capacity.
+    Classes missing from `weights` get weight 1, from `class_concurrency` no cap of their own.
+    """
+
+    # Smoothing factor for the moving averages of queue wait and call duration
+    ewma_alpha = 0.2
+
+    def __init__(self, max_concurrency: int, weights: dict[str, float], class_concurrency: dict[str, int]):
+        self.max_concurrency = max_concurrency
+        self._classes = {
+            priority: _ClassState(
+                # Settings written before a class existed don't list it
+                weight=weights.get(priority.value, 1),
+                max_concurrency=class_concurrency.get(priority.value, max_concurrency),
+            )
+            for priority in Priority
+        }
+        self._virtual_time = 0.0
+        self._in_flight = 0
+        self._avg_call_duration = 0.0
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self, priority: Priority, timeout: float | None = None) -> Iterator[None]:
+        with self._condition:
+            ticket = self._enqueue(priority)
+            self._dispatch()
+            granted = self._condition.wait_for(lambda: ticket.granted, timeout=timeout)
+            state = self._classes[priority]
+            if not granted:
+                state.queue.remove(ticket)
+                state.timed_out += 1
+                raise SchedulerTimeout(f"LLM call with priority {priority.value} waited more than {timeout}s")
+            wait = time.monotonic() - ticket.enqueued_at
+            state.avg_wait = self._ewma(state.avg_wait, wait)
+
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                state.in_flight -= 1
+                state.completed += 1
+                self._in_flight -= 1
+                self._avg_call_duration = self._ewma(self._avg_call_duration, time.monotonic() - started_at)
+                self._dispatch()
+
+    def estimate_completion(self, priority: Priority, calls: int = 1, depth: int = 1) -> float:
+        """
+        Rough time until a piece of work of this priority would finish: the calls queued in classes
+        that weigh at least as much are served first, `max_concurrency` at a time.
+
+        The work makes `calls` LLM calls in total, of which `depth` have to wait for each other
+        (e.g. chapter summaries run in parallel, then get merged: N + 1 calls, depth 2).
+        """
+        with self._condition:
+            weight = self._classes[priority].weight
+            queued_ahead = sum(len(state.queue) for state in self._classes.values() if state.weight >= weight)
+            busy = self._in_flight >= self.max_concurrency
+            rounds = (queued_ahead + calls - depth) / self.max_concurrency + (1 if busy else 0) + depth
+            return rounds * self._avg_call_duration
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "avg_call_duration": round(self._avg_call_duration, 3),
+                "classes": {
+                    priority.value: {
+                        "queue_depth": len(state.queue),
+                        "in_flight": state.in_flight,
+                        "max_concurrency": state.max_concurrency,
+                        "weight": state.weight,
+                        "completed": state.completed,
+                        "timed_out": state.timed_out,
+                        "avg_wait": round(state.avg_wait, 3),
+                    }
+                    for priority, state in self._classes.items()
+                },
+            }
+
+    def _enqueue(self, priority: Priority) -> _Ticket:
+        state = self._classes[priority]
+        tag = max(self._virtual_time, state.last_finish_tag) + 1 / state.weight
+        state.last_finish_tag = tag
+        ticket = _Ticket(priority=priority, tag=tag)
+        state.queue.append(ticket)
+        return ticket
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_concurrency:
+            eligible = [
+                state for state in self._classes.values() if state.queue and state.in_flight < state.max_concurrency
+            ]
+            if not eligible:
+                return
+
+            state = min(eligible, key=lambda s: s.queue[0].tag)
+            ticket = state.queue.popleft()
+            self._virtual_time = ticket.tag
+            ticket.granted = True
+            state.in_flight += 1
+            self._in_flight += 1
+            logger.debug(f"LLM slot granted to {ticket.priority.value}, in flight: {self._in_flight}")
+            self._condition.notify_all()
+
+    def _ewma(self, average: float, value: float) -> float:
+        return value if average == 0 else self.ewma_alpha * value + (1 - self.ewma_alpha) * average
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=config.llm_max_concurrency,
+    weights=config.llm_priority_weights,
+    class_concurrency=config.llm_priority_concurrency,
+)
@@ -4,6 +4,7 @@ from typing import TypedDict
 from loguru import logger
 
 from eightify.api.llm.base import create_system_prompt, get_llm_response, log_prompt
+from eightify.api.llm.scheduler import Priority
 from eightify.common import VideoTranscript
 from eightify.config import config
 
@@ -40,47 +41,98 @@ def create_summary_prompt(video_title: str, video_description: str, transcript:
     """
 
 
+SUMMARY_FUNCTION_SCHEMA = {
+    "name": "create_video_summary",
+    "description": "Create a summary of a YouTube video with key points",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "summary": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "emoji": {"type": "string"},
+                        "title": {"type": "string"},
+                        "content": {"type": "string"},
+                        "quote": {"type": "string"},
+                    },
+                    "required": ["emoji", "title", "content", "quote"],
+                },
+            }
+        },
+        "required": ["summary"],
+    },
+}
+
+
+def create_merge_prompt(title: str, description: str, summaries: list[str], max_points: int) -> str:
+    parts = "\n\n".join(f"Part {i}:\n{summary}" for i, summary in enumerate(summaries, 1))
+    return f"""
+    Combine the following summaries of parts of YouTube content into one summary of up to {max_points} key points.
+
+    Information:
+    Title: {title}
+    Description: {description}
+
+    Provide the summary in the same JSON format as the parts: emoji, title (max 5 words), content and quote.
+
+    Guidelines:
+    - Keep the ideas that matter for the whole, not for a single part.
+    - Merge points that repeat across parts into one.
+    - Keep the quotes exactly as they are in the parts, don't invent new ones.
+    - If there's less than {max_points} points worth keeping, return only what you can.
+
+    Summaries of the parts:
+    {parts}
+    """
+
+
 def summarize_text(
     transcript: VideoTranscript,
     video_title: str,
     video_description: str,
+    priority: Priority = Priority.INTERACTIVE,
+    model: str | None = None,
+    max_points: int = config.max_points,
+    heading: str | None = "Key Points",
 ) -> str | None:
     cropped_text = transcript.text[: config.max_transcript_length]
-    system_prompt = create_system_prompt()
-    user_prompt = create_summary_prompt(video_title, video_description, cropped_text, config.max_points)
+    user_prompt = create_summary_prompt(video_title, video_description, cropped_text, max_points)
 
     log_prompt(user_prompt, "summarize_text")
 
-    function_schema = {
-        "name": "create_video_summary",
-        "description": "Create a summary of a YouTube video with key points",
-        "parameters": {
-            "type": "object",
-            "properties": {
-                "summary": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "emoji": {"type": "string"},
-                            "title": {"type": "string"},
-                            "content": {"type": "string"},
-                            "quote": {"type": "string"},
-                        },
-                        "required": ["emoji", "title", "content", "quote"],
-                    },
-                }
-            },
-            "required": ["summary"],
-        },
-    }
+    return get_summary_response(user_prompt, priority, model, heading)
+
 
-    response = get_llm_response(system_prompt, user_prompt, function_schema)
+def merge_summaries(
+    summaries: list[str],
+    title: str,
+    description: str,
+    priority: Priority = Priority.INTERACTIVE,
+    max_points: int = config.max_points,
+    heading: str | None = "Key Points",
+) -> str | None:
+    """
+    Reduce several formatted summaries (chapters of a video, videos of a channel) into one.
+    """
+    user_prompt = create_merge_prompt(title, description, summaries, max_points)
+
+    log_prompt(user_prompt, "merge_summaries")
+
+    return get_summary_response(user_prompt, priority, heading=heading)
+
+
+def get_summary_response(
+    user_prompt: str, priority: Priority, model: str | None = None, heading: str | None = "Key Points"
+) -> str | None:
+    system_prompt = create_system_prompt()
+    response = get_llm_response(system_prompt, user_prompt, SUMMARY_FUNCTION_SCHEMA, priority, model)
 
     if response:
         try:
             summary_data = json.loads(response)["summary"]
-            formatted_summary = format_summary(summary_data)
+            formatted_summary = format_summary(summary_data, heading)
             return formatted_summary
         except (json.JSONDecodeError, KeyError):
             logger.error("Failed to parse JSON response from LLM")
@@ -95,11 +147,11 @@ class SummaryPoint(TypedDict):
     quote: str
 
 
-def format_summary(summary_data: list[SummaryPoint]) -> str:
+def format_summary(summary_data: list[SummaryPoint], heading: str | None = "Key Points") -> str:
     """
     Format the JSON summary data into a readable string.
     """
-    formatted_summary = "**Key Points**\n\n"
+    formatted_summary = f"**{heading}**\n\n" if heading else ""
     for i, point in enumerate(summary_data, 1):
         formatted_summary += (
             f"{i}. {point['emoji']} **{point['title']}:** {point['content']} " f"*\"{point['quote']}\"* \n\n"
@@ -1,21 +1,77 @@
 import os
-from typing import List, Optional
+from datetime import datetime, timezone
+from functools import partial
+from typing import Iterator, Optional
 
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from loguru import logger
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, YouTubeTranscriptApi
 
-from eightify.common import VideoComment, VideoDetails, VideoTranscript
+from eightify.api.cassette import CassetteMiss, RecordedError, cassette, strip_api_key
+from eightify.api.circuit_breaker import CircuitBreaker, CircuitOpenError
+from eightify.common import TranscriptSegment, VideoComment, VideoDetails, VideoTranscript
 from eightify.config import config
 
-youtube = build("youtube", "v3", developerKey=config.youtube_api_key.get_secret_value())
+youtube = build("youtube", "v3", developerKey=cassette.placeholder_key(config.youtube_api_key.get_secret_value()))
+
+# 4xx answers that are about our quota or key rather than the request: the upstream is unusable for everyone
+UPSTREAM_ERROR_REASONS = {
+    "quotaExceeded",
+    "dailyLimitExceeded",
+    "rateLimitExceeded",
+    "userRateLimitExceeded",
+    "keyInvalid",
+    "accessNotConfigured",
+}
+
+
+class YouTubeRequestError(Exception):
+    """
+    YouTube refused this particular request (video or playlist not found, comments disabled, private video).
+    """
+
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(f"YouTube answered {status} {reason}: {message}")
+        self.status = status
+        self.reason = reason
+
+
+# Replayed answers don't come from the upstream, they say nothing about its health
+REPLAY_ERRORS = (RecordedError, CassetteMiss)
+# Neither does a refused request: videos with comments disabled mustn't open the circuit for everyone
+youtube_breaker = CircuitBreaker("youtube", excluded_exceptions=(YouTubeRequestError, *REPLAY_ERRORS))
+# A video without an English transcript is a valid answer, not an upstream failure
+transcript_breaker = CircuitBreaker(
+    "transcript", excluded_exceptions=(NoTranscriptFound, TranscriptsDisabled, *REPLAY_ERRORS)
+)
+
+
+def execute(request) -> dict:
+    """
+    Execute a YouTube Data API request through the circuit breaker and the record/replay layer.
+    """
+    recorded_request = {"method": request.method, "uri": strip_api_key(request.uri)}
+    return youtube_breaker.call(cassette.call, "youtube", recorded_request, partial(execute_request, request))
+
+
+def execute_request(request) -> dict:
+    try:
+        return request.execute()
+    except HttpError as e:
+        # e.g. {"error": {"errors": [{"reason": "commentsDisabled", ...}], ...}}
+        details = e.error_details if isinstance(e.error_details, list) else []
+        reason = next((detail["reason"] for detail in details if isinstance(detail, dict) and "reason" in detail), "")
+        if e.status_code in (400, 403, 404) and reason not in UPSTREAM_ERROR_REASONS:
+            raise YouTubeRequestError(e.status_code, reason, e.reason) from e
+        raise
 
 
 def get_video_details(video_id: str) -> Optional[VideoDetails]:
     logger.debug(f"Getting video details for {video_id}")
 
     request = youtube.videos().list(part="snippet", id=video_id)
-    response = request.execute()
+    response = execute(request)
 
     if response["items"]:
         item = response["items"][0]
@@ -32,32 +88,114 @@ def get_video_transcript(video_id: str) -> Optional[VideoTranscript]:
     logger.debug(f"Getting video transcript for {video_id}")
 
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id, ["en"])
+        transcript = transcript_breaker.call(
+            cassette.call,
+            "transcript",
+            {"video_id": video_id, "languages": ["en"]},
+            YouTubeTranscriptApi.get_transcript,
+            video_id,
+            ["en"],
+        )
         points = [entry["text"] for entry in transcript]
         transcript_text = " ".join(points)
-        return VideoTranscript(text=transcript_text, points=points)
-
+        segments = [
+            TranscriptSegment(text=entry["text"], start=entry["start"], duration=entry.get("duration", 0.0))
+            for entry in transcript
+        ]
+        return VideoTranscript(text=transcript_text, points=points, segments=segments)
+
+    except CircuitOpenError:
+        # Not a missing transcript: the caller answers 503 with Retry-After
+        raise
     except Exception as e:
         logger.error(f"Error fetching transcript: {e}")
         return None
 
 
-def get_video_comments(video_id: str, max_results: int = config.max_number_of_comments) -> List[VideoComment]:
-    logger.debug(f"Getting video comments for {video_id}")
-    request = youtube.commentThreads().list(
-        part="snippet",
-        videoId=video_id,
-        maxResults=max_results,
-        # This ensures we get top comments and some random ones
-        # TODO: play with getting more different comments and analyzing them
-        order="relevance",
-    )
-    response = request.execute()
-
-    if not response["items"]:
-        logger.warning(f"No video comments found for {video_id}")
-        return []
-
-    return [
-        VideoComment(text=item["snippet"]["topLevelComment"]["snippet"]["textDisplay"]) for item in response["items"]
-    ]
+def iter_video_comments(
+    video_id: str, max_threads: int = config.comment_harvest_limit, order: str = "relevance"
+) -> Iterator[VideoComment]:
+    """
+    Stream comments page by page, including the replies YouTube returns inline with each thread.
+    Nothing is accumulated here, so the consumer decides how much to keep in memory.
+    """
+    logger.debug(f"Harvesting up to {max_threads} comment threads for {video_id}")
+    page_token = None
+    fetched_threads = 0
+
+    while fetched_threads < max_threads:
+        request = youtube.commentThreads().list(
+            part="snippet,replies",
+            videoId=video_id,
+            maxResults=min(100, max_threads - fetched_threads),
+            order=order,
+            pageToken=page_token,
+        )
+        response = execute(request)
+
+        for item in response["items"]:
+            top_level = item["snippet"]["topLevelComment"]["snippet"]
+            yield VideoComment(
+                text=top_level["textDisplay"],
+                like_count=top_level.get("likeCount", 0),
+                published_at=top_level.get("publishedAt"),
+                reply_count=item["snippet"].get("totalReplyCount", 0),
+            )
+            for reply in item.get("replies", {}).get("comments", []):
+                yield VideoComment(
+                    text=reply["snippet"]["textDisplay"],
+                    like_count=reply["snippet"].get("likeCount", 0),
+                    published_at=reply["snippet"].get("publishedAt"),
+                    is_reply=True,
+                )
+
+        fetched_threads += len(response["items"])
+        page_token = response.get("nextPageToken")
+        if not page_token or not response["items"]:
+            break
+
+
+def get_playlist_video_ids(
+    playlist_id: str, max_videos: int = config.rollup_max_videos, published_after: datetime | None = None
+) -> list[str]:
+    """
+    Video ids of a playlist in playlist order. With `published_after`, stops at the first older video,
+    which is exactly what's needed for the (newest first) uploads playlist of a channel.
+    """
+    logger.debug(f"Getting videos of playlist {playlist_id}")
+    if published_after and published_after.tzinfo is None:
+        published_after = published_after.replace(tzinfo=timezone.utc)
+    video_ids: list[str] = []
+    page_token = None
+
+    while len(video_ids) < max_videos:
+        request = youtube.playlistItems().list(
+            part="contentDetails",
+            playlistId=playlist_id,
+            maxResults=min(50, max_videos - len(video_ids)),
+            pageToken=page_token,
+        )
+        response = execute(request)
+
+        for item in response["items"]:
+            published_at = item["contentDetails"].get("videoPublishedAt")
+            if published_after and published_at and datetime.fromisoformat(published_at) < published_after:
+                return video_ids
+            video_ids.append(item["contentDetails"]["videoId"])
+
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+
+    return video_ids[:max_videos]
+
+
+def get_channel_uploads_playlist(channel_id: str) -> Optional[str]:
+    request = youtube.channels().list(part="contentDetails", id=channel_id)
+    response = execute(request)
+
+    if response.get("items"):
+        return response["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+
+    logger.error(f"No channel found for {channel_id}")
+    return None
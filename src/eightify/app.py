@@ -1,4 +1,5 @@
 import re
+import uuid
 
 import requests
 import streamlit as st
@@ -8,20 +9,34 @@ from eightify.common import CommentAnalysis, VideoComment, VideoDetails
 from eightify.config import config
 from eightify.utils import extract_video_id
 
+# st.experimental_fragment was renamed to st.fragment in Streamlit 1.37 and later removed
+fragment = getattr(st, "fragment", None) or st.experimental_fragment
+
 
 @st.cache_data
 def fetch_video_details(video_id: str) -> VideoDetails | None:
     return get_video_details(video_id)
 
 
-def make_api_request(endpoint: str, data: dict, timeout: int = 60) -> dict | None:
+def make_api_request(endpoint: str, data: dict | None = None, timeout: int = 60, method: str = "post") -> dict | None:
     try:
-        response = requests.post(
+        response = requests.request(
+            method,
             f"{config.backend_url}/{endpoint}",
             json=data,
             timeout=timeout,
+            # Lets the backend rate limit each browser session separately
+            headers={"X-Client-Id": st.session_state.client_id},
         )
+        if response.status_code in (429, 503):
+            st.write(
+                f"The server is busy, please try again in {response.headers.get('Retry-After', 'a few')} seconds 🐢"
+            )
+            return None
         response.raise_for_status()
+        # Nothing to show, e.g. a video with comments disabled
+        if response.status_code == 204:
+            return None
         return response.json()
     except requests.exceptions.Timeout:
         st.write("Request timed out. The server might be busy. Please try again later. 🕒")
@@ -30,10 +45,27 @@ def make_api_request(endpoint: str, data: dict, timeout: int = 60) -> dict | Non
     return None
 
 
-@st.cache_data
-def summarize_transcript(video_id: str) -> str | None:
-    result = make_api_request("summarize", {"video_id": video_id})
-    return result.get("summary") if result else None
+def summarize_transcript(video_id: str, by_chapters: bool = False) -> dict | None:
+    return make_api_request("summarize", {"video_id": video_id, "progressive": True, "chapters": by_chapters})
+
+
+@fragment(run_every=2)
+def display_summary(video_id: str):
+    # The first answer may be a quick draft, poll the backend until the refined summary replaces it
+    # or the backend gives up on refining it
+    if st.session_state.summary_is_draft and not st.session_state.summary_refine_failed:
+        result = make_api_request(f"summary/{video_id}", method="get", timeout=5)
+        if result and not result["draft"]:
+            st.session_state.summary = result["summary"]
+            st.session_state.summary_is_draft = False
+        elif result and result["refine_failed"]:
+            st.session_state.summary_refine_failed = True
+
+    st.write(st.session_state.summary)
+    if st.session_state.summary_refine_failed:
+        st.caption("✏️ This is a quick draft, a more thorough summary couldn't be made right now. Try again later.")
+    elif st.session_state.summary_is_draft:
+        st.caption("✏️ This is a quick draft, a more thorough summary is on its way...")
 
 
 @st.cache_data
@@ -64,6 +96,7 @@ def set_state(i):
 def display_sidebar_info():
     st.sidebar.title("About")
     st.sidebar.info("🍓 Hello! Eightify is a tool to quickly gain insights from YouTube videos. Relax and enjoy!")
+    st.sidebar.toggle("🔖 Summarize by chapters (if the video has them)", key="by_chapters")
 
 
 def display_topic_comments(topic_comments):
@@ -86,6 +119,8 @@ def main():
 
     if "stage" not in st.session_state:
         st.session_state.stage = 0
+    if "client_id" not in st.session_state:
+        st.session_state.client_id = uuid.uuid4().hex
 
     if st.session_state.stage == 0:
         st.button("Start", on_click=set_state, args=[1])
@@ -121,9 +156,11 @@ def main():
                         st.stop()
                     transcript = transcript.points
 
-                    summary = summarize_transcript(video_id)
+                    summary = summarize_transcript(video_id, st.session_state.by_chapters)
 
-                st.session_state.summary = summary
+                st.session_state.summary = summary["summary"] if summary else None
+                st.session_state.summary_is_draft = bool(summary and summary["draft"])
+                st.session_state.summary_refine_failed = bool(summary and summary["refine_failed"])
                 st.session_state.transcript = transcript
 
             # TODO: transcript is shown twice
@@ -132,7 +169,7 @@ def main():
 
         with col2:
             st.header("✨ Summary")
-            st.write(st.session_state.summary)
+            display_summary(video_id)
 
         st.header("💭 Comment Analysis")
 
@@ -159,6 +196,8 @@ def main():
 
             st.subheader("📌 TLDR")
             st.write(comment_analysis.overall_analysis)
+            if comment_analysis.stale:
+                st.caption("🕰️ Showing a previous analysis while a fresh one is being prepared.")
 
             st.subheader("👀 Comment Topics")
             topic_buttons = st.columns(len(comment_analysis.topics))
@@ -0,0 +1,57 @@
+import time
+from dataclasses import dataclass, field
+from typing import Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheEntry(Generic[T]):
+    value: T
+    created_at: float = field(default_factory=time.time)
+
+
+class StaleCache(Generic[T]):
+    """
+    In-memory cache that never evicts on expiry: stale entries are still returned so that
+    the last good result can be served while it's being refreshed (or while the upstream is down).
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[Hashable, CacheEntry[T]] = {}
+        self._refreshing: set[Hashable] = set()
+
+    def get(self, key: Hashable) -> CacheEntry[T] | None:
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: T, created_at: float | None = None) -> None:
+        """
+        Store the value as new, or as of `created_at` (e.g. 0 for a result that should be refreshed right away).
+        """
+        self._entries[key] = CacheEntry(value) if created_at is None else CacheEntry(value, created_at)
+
+    def is_stale(self, entry: CacheEntry[T]) -> bool:
+        return time.time() - entry.created_at > self.ttl
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def keys(self) -> list[Hashable]:
+        return list(self._entries)
+
+    def start_refresh(self, key: Hashable) -> bool:
+        """
+        Mark the key as being refreshed. Returns False if a refresh is already in progress.
+        """
+        if key in self._refreshing:
+            return False
+        self._refreshing.add(key)
+        return True
+
+    def finish_refresh(self, key: Hashable) -> None:
+        self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._refreshing.clear()
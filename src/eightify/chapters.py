@@ -0,0 +1,71 @@
+import re
+
+from eightify.common import TranscriptSegment, VideoChapter, VideoTranscript
+
+TIMESTAMP = r"(?:\d{1,2}:)?\d{1,2}:\d{2}"
+# "00:00 Intro", "[04:12] - Setup", "1:02:03 | Q&A"
+TIMESTAMP_FIRST = re.compile(rf"^\s*[\[(]?(?P<ts>{TIMESTAMP})[\])]?\s*[-–—:|.]?\s*(?P<title>.+?)\s*$")
+# "Intro - 00:00", "Setup (04:12)"
+TIMESTAMP_LAST = re.compile(rf"^\s*(?P<title>.+?)\s*[-–—:|]?\s*[\[(]?(?P<ts>{TIMESTAMP})[\])]?\s*$")
+
+# YouTube only shows chapters when there are at least 3 of them, starting at 0:00
+MIN_CHAPTERS = 3
+
+
+def parse_timestamp(timestamp: str) -> float:
+    seconds = 0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + int(part)
+    return float(seconds)
+
+
+def format_timestamp(seconds: float) -> str:
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes:02}:{seconds:02}"
+
+
+def parse_chapters(description: str) -> list[VideoChapter]:
+    """
+    Extract chapters from a video description the same way YouTube does:
+    lines with timestamps, in ascending order, the first one at 0:00.
+
+    Returns an empty list if the description doesn't define chapters.
+    """
+    chapters: list[VideoChapter] = []
+    for line in description.splitlines():
+        match = TIMESTAMP_FIRST.match(line) or TIMESTAMP_LAST.match(line)
+        if not match:
+            continue
+
+        start = parse_timestamp(match["ts"])
+        if chapters and start <= chapters[-1].start:
+            continue
+        if chapters:
+            chapters[-1].end = start
+        chapters.append(VideoChapter(title=match["title"], start=start))
+
+    if len(chapters) < MIN_CHAPTERS or chapters[0].start != 0:
+        return []
+    return chapters
+
+
+def slice_transcript(transcript: VideoTranscript, chapters: list[VideoChapter]) -> list[VideoTranscript]:
+    """
+    Split the timestamped transcript into one transcript per chapter.
+    """
+    slices: list[list[TranscriptSegment]] = [[] for _ in chapters]
+    chapter_index = 0
+    for segment in transcript.segments:
+        while chapter_index + 1 < len(chapters) and segment.start >= chapters[chapter_index + 1].start:
+            chapter_index += 1
+        slices[chapter_index].append(segment)
+
+    return [
+        VideoTranscript(
+            text=" ".join(segment.text for segment in segments),
+            points=[segment.text for segment in segments],
+            segments=segments,
+        )
+        for segments in slices
+    ]
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -16,13 +18,35 @@ class VideoDetails(BaseModel):
     description: str
 
 
+class TranscriptSegment(BaseModel):
+    text: str
+    start: float
+    duration: float = 0.0
+
+
 class VideoTranscript(BaseModel):
     text: str
     points: list[str]
+    segments: list[TranscriptSegment] = []
+
+
+class VideoChapter(BaseModel):
+    title: str
+    start: float
+    end: float | None = None
+
+
+class ChapterSummary(BaseModel):
+    chapter: VideoChapter
+    summary: str
 
 
 class VideoComment(BaseModel):
     text: str
+    like_count: int = 0
+    published_at: datetime | None = None
+    reply_count: int = 0
+    is_reply: bool = False
 
 
 class CommentTopic(BaseModel):
@@ -35,3 +59,4 @@ class CommentAnalysis(BaseModel):
     comments: list[VideoComment]
     overall_analysis: str
     topics: list[CommentTopic]
+    stale: bool = False
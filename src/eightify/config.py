@@ -1,7 +1,7 @@
 from typing import Optional
 
 from loguru import logger
-from pydantic import SecretStr
+from pydantic import BaseModel, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from rich.logging import RichHandler
 from rich.traceback import install
@@ -9,21 +9,113 @@ from rich.traceback import install
 install(show_locals=True)
 
 
+class LLMProviderSettings(BaseModel):
+    """
+    Any OpenAI-compatible chat completions endpoint: OpenAI itself, hosted open models, a local llama server.
+    """
+
+    name: str
+    # None is api.openai.com
+    base_url: Optional[str] = None
+    api_key: SecretStr = SecretStr("")
+    # Model to use for every call instead of the requested one, for servers that have their own model names
+    model: Optional[str] = None
+    function_calling: bool = True
+    max_context_tokens: int = 128_000
+    # Failing over to the next provider is faster than retrying the same one
+    max_retries: int = 0
+
+
 class Settings(BaseSettings):
     llm_model: str = "gpt-4o"
+    # Fast model for the draft summary returned while llm_model is working on the refined one
+    draft_llm_model: str = "gpt-4o-mini"
+    llm_timeout: float = 60.0
     openai_api_key: SecretStr = ""
+    # JSON list of LLMProviderSettings, by default just OpenAI with openai_api_key (see api/llm/providers.py)
+    llm_providers: list[LLMProviderSettings] = []
+    # Weight of the latest call in the per-provider latency and error rate averages
+    llm_ewma_alpha: float = 0.3
+    # Providers erroring more than this are only tried after the healthy ones
+    llm_provider_max_error_rate: float = 0.5
+    # A provider that hasn't been called for this long gets the next call, to notice that it got faster again
+    llm_provider_probe_interval: float = 30.0
     youtube_api_key: SecretStr = ""
     min_number_of_comments: int = 10
     max_number_of_comments: int = 200
+    # Comments are harvested page by page (up to the limit of threads) and sampled down to the token budget
+    comment_harvest_limit: int = 1000
+    comment_token_budget: int = 8000
+    comment_reservoir_size: int = 100
+    comment_sample_seed: int = 0
     max_number_of_topics: int = 5
+    # Insight requests are cached by their content words; a request at least this similar (Jaccard) to a cached one
+    # reuses it, 1.0 means only exact matches of the content words
+    insight_similarity_threshold: float = 0.75
+    # Model answering insight requests from the base analysis, None is llm_model.
+    # draft_llm_model is much cheaper and usually good enough for picking from ready-made topics
+    insight_llm_model: Optional[str] = None
     max_points: int = 7
+    # Chapter mode: every chapter found in the description is summarized separately, in parallel
+    chapter_max_points: int = 3
+    chapter_summary_concurrency: int = 8
     # TODO: default should be some small int to avoid burning API credits relentlessly
     # but .env parsing of "null" into Optional[int] is not working as expected
     max_transcript_length: Optional[int] = None
+    # Channel/playlist roll-ups: per-video summaries are merged in a tree, `rollup_fanout` at a time
+    # (at least 2), generating the missing ones `rollup_concurrency` videos at a time
+    rollup_fanout: int = 4
+    rollup_max_videos: int = 50
+    rollup_concurrency: int = 8
+    # Strip non-speech tags, fillers and overlapping caption windows before prompting
+    clean_transcripts: bool = True
+    # Local on-disk store of fetched transcripts and comments, survives restarts
+    use_corpus: bool = True
+    corpus_dir: str = "corpus"
+    corpus_segment_size: int = 64 * 1024 * 1024
+    corpus_comment_batch_size: int = 500
+    # Reuse summaries between videos with the same (or near-identical) transcript
+    dedup_max_distance: int = 3
+    dedup_min_words: int = 200
     log_level: str = "DEBUG"
     log_prompt_length: int = 100
     api_port: int = 8000
     port: int = 8501
+    # Record/replay of YouTube and LLM calls: "off", "record" or "replay" (see api/cassette.py)
+    cassette_mode: str = "off"
+    cassette_dir: str = "tests/cassettes"
+    cassette_replay_latency: bool = False
+    # Circuit breakers around upstreams (LLM, YouTube Data API, transcript API)
+    circuit_failure_threshold: float = 0.5
+    circuit_window: int = 20
+    circuit_min_calls: int = 5
+    circuit_recovery_timeout: float = 30.0
+    # Scheduling of LLM calls between priority classes (see api/llm/scheduler.py), unlisted classes get weight 1
+    llm_max_concurrency: int = 8
+    llm_priority_weights: dict[str, float] = {"interactive": 6, "comments": 3, "rollup": 2, "background": 1}
+    llm_priority_concurrency: dict[str, int] = {"interactive": 8, "comments": 6, "rollup": 6, "background": 2}
+    # Threads the endpoints run LLM work in. Calls queue for a slot inside these threads, so there have to be
+    # plenty more than llm_max_concurrency: otherwise they queue first-come-first-served for a thread instead
+    llm_worker_threads: int = 64
+    llm_queue_timeout: float = 60.0
+    # Opt-in request profiling: by the X-Eightify-Profile: 1 header and/or for a random share of requests.
+    # The header lets any client make the server profile and write to disk, only enable it where that's fine
+    profile_allow_header: bool = False
+    profile_sample_rate: float = 0.0
+    profile_dir: str = "profiles"
+    profile_max_files: int = 100
+    # Per-client rate limiting of the endpoints that call the LLM
+    rate_limit_per_minute: float = 10
+    rate_limit_burst: int = 5
+    rate_limit_max_clients: int = 10_000
+    # Addresses of our reverse proxies: X-Forwarded-For is only believed when the request comes from one of them.
+    # With a proxy on the same machine (127.0.0.1 here), X-Client-Id of the frontend isn't believed anymore
+    trusted_proxies: list[str] = []
+    # Requests that can't finish in time (the frontend gives up after 60s) are rejected upfront
+    request_deadline: float = 60.0
+    # Cached results older than this are served as stale while being refreshed in the background
+    summary_cache_ttl: int = 24 * 60 * 60
+    analysis_cache_ttl: int = 6 * 60 * 60
 
     @property
     def backend_url(self) -> str:
@@ -0,0 +1,268 @@
+import json
+import mmap
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import IO, Iterable, Iterator, NamedTuple
+
+from loguru import logger
+
+from eightify.common import VideoComment, VideoDetails, VideoTranscript
+from eightify.config import config
+
+INDEX_FILE = "index.jsonl"
+
+
+class Location(NamedTuple):
+    segment: int
+    offset: int
+    length: int
+
+
+class CorpusStore:
+    """
+    Append-only store of compressed records on local disk.
+
+    Records are zlib-compressed and appended to segment files (`segment-000001.seg`, ...); a new segment is started
+    once the current one grows over `max_segment_size`. `index.jsonl` maps keys to (segment, offset, length) and is
+    only appended to as well, a later line for the same key wins. Data is written and synced before its index line,
+    so a crash can lose the last batch but never point the index at garbage.
+
+    Reads go through mmap: a record is decompressed straight from a memoryview of the mapped segment.
+    Overwritten records stay on disk until `compact()` rewrites the live ones into fresh segments.
+    Segments the index doesn't point to (leftovers of an interrupted compaction) are deleted on open.
+    """
+
+    def __init__(self, directory: str | Path, max_segment_size: int = config.corpus_segment_size):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_size = max_segment_size
+
+        self._index: dict[str, Location] = {}
+        self._maps: dict[int, mmap.mmap] = {}
+        self._lock = threading.RLock()
+        self._load_index()
+        self._remove_unused_segments()
+
+        segments = self._segment_numbers()
+        self._active_segment = segments[-1] if segments else 1
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            view = memoryview(self._map(location.segment, location.offset + location.length))
+            try:
+                return zlib.decompress(view[location.offset : location.offset + location.length])
+            finally:
+                view.release()
+
+    def put(self, key: str, value: bytes) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, records: dict[str, bytes]) -> None:
+        if not records:
+            return
+        with self._lock, open(self.directory / INDEX_FILE, "a") as index_file:
+            self._append(records, self._index, index_file)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def keys(self) -> list[str]:
+        return list(self._index)
+
+    def stats(self) -> dict:
+        with self._lock:
+            segments = self._segment_numbers()
+            total_size = sum(self._segment_path(segment).stat().st_size for segment in segments)
+            live_size = sum(location.length for location in self._index.values())
+            return {"records": len(self._index), "segments": len(segments), "size": total_size, "live_size": live_size}
+
+    def compact(self) -> None:
+        """
+        Rewrite the live records into new segments and drop the old ones.
+
+        Records are copied over one segment's worth at a time, and the new index goes to a temporary file that
+        atomically replaces the old one at the end. Until then the old index and segments stay untouched,
+        so a crash at any point leaves a complete store behind.
+        """
+        with self._lock:
+            old_segments = self._segment_numbers()
+            logger.info(f"Compacting corpus: {len(self._index)} live records in {len(old_segments)} segments")
+
+            old_active_segment = self._active_segment
+            self._active_segment = (old_segments[-1] if old_segments else 0) + 1
+            index_path = self.directory / INDEX_FILE
+            new_index_path = index_path.with_suffix(".tmp")
+            new_index: dict[str, Location] = {}
+            try:
+                with open(new_index_path, "w") as new_index_file:
+                    batch: dict[str, bytes] = {}
+                    batch_size = 0
+                    for key in list(self._index):
+                        batch[key] = self.get(key)
+                        batch_size += len(batch[key])
+                        if batch_size >= self.max_segment_size:
+                            self._append(batch, new_index, new_index_file)
+                            batch, batch_size = {}, 0
+                    self._append(batch, new_index, new_index_file)
+                os.replace(new_index_path, index_path)
+            except Exception:
+                # Keep serving from the old segments
+                self._active_segment = old_active_segment
+                new_index_path.unlink(missing_ok=True)
+                for segment in self._segment_numbers():
+                    if segment not in old_segments:
+                        self._segment_path(segment).unlink(missing_ok=True)
+                raise
+
+            self._close_maps()
+            self._index = new_index
+            for segment in old_segments:
+                self._segment_path(segment).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_maps()
+
+    def _append(self, records: dict[str, bytes], index: dict[str, Location], index_file: IO[str]) -> None:
+        """
+        Write the records to the active segment, then their locations to `index` and `index_file`.
+        """
+        if not records:
+            return
+        segment_path = self._segment_path(self._active_segment)
+        if segment_path.exists() and segment_path.stat().st_size >= self.max_segment_size:
+            self._active_segment += 1
+            segment_path = self._segment_path(self._active_segment)
+
+        compressed = {key: zlib.compress(value) for key, value in records.items()}
+        with open(segment_path, "ab") as segment:
+            offset = segment.tell()
+            segment.write(b"".join(compressed.values()))
+            segment.flush()
+            os.fsync(segment.fileno())
+
+        index_lines = []
+        for key, data in compressed.items():
+            index[key] = Location(self._active_segment, offset, len(data))
+            index_lines.append(json.dumps({"key": key, **index[key]._asdict()}) + "\n")
+            offset += len(data)
+        index_file.write("".join(index_lines))
+        index_file.flush()
+        os.fsync(index_file.fileno())
+
+    def _map(self, segment: int, min_size: int) -> mmap.mmap:
+        mapped = self._maps.get(segment)
+        # The active segment grows, remap it when a record lies past the mapped end
+        if mapped is None or len(mapped) < min_size:
+            if mapped is not None:
+                mapped.close()
+            with open(self._segment_path(segment), "rb") as f:
+                mapped = self._maps[segment] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return mapped
+
+    def _close_maps(self) -> None:
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+    def _load_index(self) -> None:
+        index_path = self.directory / INDEX_FILE
+        # Index of an interrupted compaction, the old one is still in place
+        index_path.with_suffix(".tmp").unlink(missing_ok=True)
+        if not index_path.exists() and index_path.with_suffix(".old").exists():
+            # Interrupted compaction of an older version, which moved the index aside first
+            index_path.with_suffix(".old").replace(index_path)
+        if not index_path.exists():
+            return
+        with open(index_path) as index:
+            for line in index:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write of the last line during a crash
+                    logger.warning(f"Skipping a broken line in {index_path}")
+                    continue
+                self._index[entry["key"]] = Location(entry["segment"], entry["offset"], entry["length"])
+
+    def _remove_unused_segments(self) -> None:
+        used = {location.segment for location in self._index.values()}
+        for segment in self._segment_numbers():
+            if segment not in used:
+                logger.warning(f"Removing {self._segment_path(segment)}, no record points to it")
+                self._segment_path(segment).unlink()
+
+    def _segment_numbers(self) -> list[int]:
+        return sorted(int(path.stem.split("-")[1]) for path in self.directory.glob("segment-*.seg"))
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.directory / f"segment-{segment:06}.seg"
+
+
+def load_video_details(store: CorpusStore, video_id: str) -> VideoDetails | None:
+    data = store.get(f"details:{video_id}")
+    return VideoDetails.model_validate_json(data) if data else None
+
+
+def save_video_details(store: CorpusStore, video_id: str, video_details: VideoDetails) -> None:
+    store.put(f"details:{video_id}", video_details.model_dump_json().encode())
+
+
+def load_transcript(store: CorpusStore, video_id: str) -> VideoTranscript | None:
+    data = store.get(f"transcript:{video_id}")
+    return VideoTranscript.model_validate_json(data) if data else None
+
+
+def save_transcript(store: CorpusStore, video_id: str, transcript: VideoTranscript) -> None:
+    store.put(f"transcript:{video_id}", transcript.model_dump_json().encode())
+
+
+def iter_comments(store: CorpusStore, video_id: str) -> Iterator[VideoComment] | None:
+    """
+    Stored comments of the video batch by batch, or None if there's no complete harvest stored.
+    """
+    manifest = store.get(f"comments:{video_id}")
+    if manifest is None:
+        return None
+
+    def batches() -> Iterator[VideoComment]:
+        for batch in range(json.loads(manifest)["batches"]):
+            for comment in json.loads(store.get(f"comments:{video_id}:{batch}")):
+                yield VideoComment.model_validate(comment)
+
+    return batches()
+
+
+def record_comments(
+    store: CorpusStore,
+    video_id: str,
+    comments: Iterable[VideoComment],
+    batch_size: int = config.corpus_comment_batch_size,
+) -> Iterator[VideoComment]:
+    """
+    Pass the comment stream through, writing it to the store in batches on the way.
+    The manifest is written last, so an interrupted harvest is never read back as a complete one.
+    """
+    batch: list[VideoComment] = []
+    batch_count = 0
+    for comment in comments:
+        batch.append(comment)
+        yield comment
+        if len(batch) == batch_size:
+            store.put(f"comments:{video_id}:{batch_count}", _dump_comments(batch))
+            batch, batch_count = [], batch_count + 1
+
+    store.put_many(
+        {
+            f"comments:{video_id}:{batch_count}": _dump_comments(batch),
+            f"comments:{video_id}": json.dumps({"batches": batch_count + 1}).encode(),
+        }
+    )
+
+
+def _dump_comments(comments: list[VideoComment]) -> bytes:
+    return json.dumps([comment.model_dump(mode="json") for comment in comments]).encode()
@@ -0,0 +1,100 @@
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+
+from eightify.config import config
+
+NON_WORD = re.compile(r"[^\w\s]+")
+WHITESPACE = re.compile(r"\s+")
+
+SIMHASH_BITS = 64
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    exact: str
+    simhash: int
+    words: int
+
+
+def normalize_text(text: str) -> str:
+    text = NON_WORD.sub(" ", text.lower())
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def simhash(words: list[str], shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash over word shingles: texts that differ in a few words get hashes that differ in a few bits.
+    """
+    shingles = [" ".join(words[i : i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))]
+    # One bit string per shingle, then count ones column by column: keeps the per-bit loop out of Python
+    bit_strings = [
+        format(int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"), "064b")
+        for shingle in shingles
+    ]
+    half = len(bit_strings) / 2
+    bits = "".join("1" if column.count("1") > half else "0" for column in zip(*bit_strings))
+    return int(bits, 2)
+
+
+def fingerprint(text: str) -> Fingerprint:
+    normalized = normalize_text(text)
+    words = normalized.split(" ")
+    return Fingerprint(
+        exact=hashlib.sha256(normalized.encode()).hexdigest(),
+        simhash=simhash(words),
+        words=len(words),
+    )
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class FingerprintIndex:
+    """
+    Finds transcripts with the same content under different video ids (re-uploads, mirrors, clips).
+
+    Exact duplicates are found by the hash of the normalized text. Near duplicates are found by SimHash:
+    the 64 bits are split into `max_distance + 1` bands, so two hashes within `max_distance` bits of each other
+    share at least one band exactly and only the fingerprints in the same band buckets have to be compared.
+    """
+
+    def __init__(self, max_distance: int = config.dedup_max_distance, min_words: int = config.dedup_min_words):
+        self.max_distance = max_distance
+        # Short texts aren't matched at all: SimHash of them is too noisy, and after cleanup many are
+        # identical without being the same video (nothing but [Music], a one-line intro...)
+        self.min_words = min_words
+        self._band_count = max_distance + 1
+        self._band_bits = SIMHASH_BITS // self._band_count
+        self._exact: dict[str, list[str]] = defaultdict(list)
+        self._bands: dict[tuple[int, int], list[tuple[int, str]]] = defaultdict(list)
+
+    def add(self, fp: Fingerprint, key: str) -> None:
+        if fp.words < self.min_words or key in self._exact[fp.exact]:
+            return
+        self._exact[fp.exact].append(key)
+        for band in self._band_keys(fp.simhash):
+            self._bands[band].append((fp.simhash, key))
+
+    def find(self, fp: Fingerprint) -> list[str]:
+        """
+        Keys of the duplicates of the fingerprint: exact ones first, then near ones by increasing distance.
+        """
+        if fp.words < self.min_words:
+            return []
+        matches = list(self._exact.get(fp.exact, []))
+
+        near: dict[str, int] = {}
+        for band in self._band_keys(fp.simhash):
+            for candidate_hash, key in self._bands.get(band, []):
+                distance = hamming_distance(fp.simhash, candidate_hash)
+                if distance <= self.max_distance and key not in matches:
+                    near[key] = min(distance, near.get(key, distance))
+
+        return matches + sorted(near, key=near.get)
+
+    def _band_keys(self, value: int) -> list[tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        return [(band, value >> (band * self._band_bits) & mask) for band in range(self._band_count)]
@@ -0,0 +1,69 @@
+from typing import Iterable
+
+from eightify.config import config
+from eightify.fingerprint import normalize_text
+
+# Function words plus the words every insight request is made of anyway ("what do viewers think about ...").
+# Negations, comparatives and directions are content: "who did NOT like the diet" isn't "who liked the diet",
+# "people over 50" aren't "people under 50", "after the update" isn't "the update"
+STOPWORDS = frozenset(
+    """
+    a about again all also am an and any are as at be been being but by can could did do does doing
+    for from had has have having he her here hers him his how i if in into is it its just me my
+    of on or other our ours out own same she should so some such than that the their theirs them then
+    there these they this those through to too up very was we were what when where which while who
+    whom why will with would you your yours
+    viewer viewers people person commenter commenters comment comments audience everyone anyone someone
+    think thinks thought say says said feel feels opinion opinions video tell show find want know
+    """.split()
+)
+
+# Words ending in "s" that aren't plurals, folding them would make "news" meet "new"
+NOT_PLURALS = frozenset(
+    "news series species means lens bias gas physics politics economics ethics mathematics statistics".split()
+)
+
+
+def content_words(text: str) -> set[str]:
+    words = set()
+    for word in normalize_text(text).split():
+        if word in STOPWORDS:
+            continue
+        # Crude plural folding, enough for "diets" and "diet" to meet
+        if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")) and word not in NOT_PLURALS:
+            word = word[:-1]
+        if word not in STOPWORDS:
+            words.add(word)
+    return words
+
+
+def canonical_insight_request(insight_request: str | None) -> str | None:
+    """
+    Cache key of an insight request: its content words, sorted. None for an empty request
+    or one with nothing but stopwords, which asks for the same thing as no request at all.
+    """
+    if not insight_request:
+        return None
+    return " ".join(sorted(content_words(insight_request))) or None
+
+
+def insight_similarity(a: str, b: str) -> float:
+    """
+    Jaccard similarity of two canonical requests.
+    """
+    words_a, words_b = set(a.split()), set(b.split())
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def find_similar_request(
+    canonical: str, known: Iterable[str], threshold: float = config.insight_similarity_threshold
+) -> str | None:
+    """
+    The known canonical request closest to `canonical`, if it's at least `threshold` similar.
+    """
+    best, best_similarity = None, threshold
+    for candidate in known:
+        similarity = insight_similarity(canonical, candidate)
+        if similarity >= best_similarity:
+            best, best_similarity = candidate, similarity
+    return best
@@ -0,0 +1,348 @@
+"""
+Load generator for the backend: how many users can one deployment take before p95 latency breaks the SLO.
+
+Replays a mix of /summarize and /analyze_comments requests with Zipf-distributed video popularity, either as
+a closed loop (N users, each waiting for the answer before the next request) or an open loop (Poisson arrivals
+at a fixed rate, whatever the latency). Every level runs for a fixed time, then the report shows
+latency vs throughput, error rates and the saturation point.
+
+By default the app is started in-process with local stub upstreams (YouTube and OpenAI with simulated latency),
+so it runs offline:
+
+    python -m eightify.loadtest --mode closed --levels 1 2 4 8 16
+    python -m eightify.loadtest --mode open --levels 0.5 1 2 4 --llm-latency 2
+    python -m eightify.loadtest --url http://my-deployment:8000  # real upstreams, real bills
+"""
+
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+
+import requests
+
+STUB_WORDS = "the of and to in is that it for on with as this was are be at by you not but from have or".split()
+
+
+@dataclass
+class Result:
+    endpoint: str
+    latency: float
+    status: int
+
+
+@dataclass
+class LevelReport:
+    level: float
+    requests: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+    error_rate: float
+    status_counts: dict[int, int] = field(default_factory=dict)
+
+
+class Workload:
+    """
+    Zipf-distributed video popularity: the video of rank k is requested with probability ∝ 1 / k^s.
+    """
+
+    def __init__(self, videos: int, zipf_s: float, comments_ratio: float, seed: int):
+        self.video_ids = [f"video{i:05}" for i in range(videos)]
+        weights = [1 / rank**zipf_s for rank in range(1, videos + 1)]
+        self.cumulative_weights = list(itertools.accumulate(weights))
+        self.comments_ratio = comments_ratio
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def next_request(self) -> tuple[str, dict]:
+        with self.lock:
+            point = self.random.random() * self.cumulative_weights[-1]
+            video_id = self.video_ids[bisect.bisect(self.cumulative_weights, point)]
+            if self.random.random() < self.comments_ratio:
+                return "analyze_comments", {"video_id": video_id}
+            return "summarize", {"video_id": video_id}
+
+
+def send_request(url: str, workload: Workload, client_id: str, timeout: float) -> Result:
+    endpoint, payload = workload.next_request()
+    started_at = time.perf_counter()
+    try:
+        response = requests.post(f"{url}/{endpoint}", json=payload, timeout=timeout, headers={"X-Client-Id": client_id})
+        status = response.status_code
+    except requests.exceptions.RequestException:
+        status = 0
+    return Result(endpoint=endpoint, latency=time.perf_counter() - started_at, status=status)
+
+
+def run_closed_loop(url: str, workload: Workload, users: int, duration: float, think_time: float, timeout: float):
+    results: list[Result] = []
+    deadline = time.perf_counter() + duration
+
+    def user_loop():
+        client_id = uuid.uuid4().hex
+        while time.perf_counter() < deadline:
+            results.append(send_request(url, workload, client_id, timeout))
+            time.sleep(think_time)
+
+    threads = [threading.Thread(target=user_loop) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_open_loop(url: str, workload: Workload, rate: float, duration: float, timeout: float, seed: int):
+    """
+    Requests arrive as a Poisson process regardless of how fast they're answered. Latency is measured from
+    the scheduled arrival, so a slow server isn't hidden by the generator falling behind.
+    """
+    arrivals = random.Random(seed)
+    results: list[Result] = []
+    client_ids = [uuid.uuid4().hex for _ in range(max(1, int(rate * 10)))]
+
+    def arrive(scheduled_at: float, client_id: str):
+        result = send_request(url, workload, client_id, timeout)
+        result.latency = time.perf_counter() - scheduled_at
+        results.append(result)
+
+    with ThreadPoolExecutor(max_workers=512) as executor:
+        started_at = next_arrival = time.perf_counter()
+        while next_arrival < started_at + duration:
+            time.sleep(max(0.0, next_arrival - time.perf_counter()))
+            executor.submit(arrive, next_arrival, arrivals.choice(client_ids))
+            next_arrival += arrivals.expovariate(rate)
+    return results
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize_level(level: float, results: list[Result], duration: float) -> LevelReport:
+    latencies = sorted(result.latency for result in results)
+    status_counts: dict[int, int] = {}
+    for result in results:
+        status_counts[result.status] = status_counts.get(result.status, 0) + 1
+    errors = sum(count for status, count in status_counts.items() if not 200 <= status < 300)
+    return LevelReport(
+        level=level,
+        requests=len(results),
+        throughput=round((len(results) - errors) / duration, 2),
+        p50=round(percentile(latencies, 0.50), 3),
+        p95=round(percentile(latencies, 0.95), 3),
+        p99=round(percentile(latencies, 0.99), 3),
+        error_rate=round(errors / len(results), 3) if results else 0.0,
+        status_counts=status_counts,
+    )
+
+
+def find_saturation(reports: list[LevelReport], slo_p95: float, max_error_rate: float) -> LevelReport | None:
+    """
+    First level that breaks the SLO, or where the goodput stops growing with load.
+    """
+    for previous, report in zip([None] + reports, reports):
+        if report.p95 > slo_p95 or report.error_rate > max_error_rate:
+            return report
+        if previous and report.throughput <= previous.throughput * 1.05:
+            return report
+    return None
+
+
+def print_report(reports: list[LevelReport], saturation: LevelReport | None, mode: str, slo_p95: float):
+    level_name = "users" if mode == "closed" else "rps in"
+    print(f"\n{level_name:>8} {'requests':>9} {'goodput':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'errors':>7}")
+    for report in reports:
+        marker = "  <- saturation" if report is saturation else ""
+        print(
+            f"{report.level:>8g} {report.requests:>9} {report.throughput:>8.2f} {report.p50:>7.2f} "
+            f"{report.p95:>7.2f} {report.p99:>7.2f} {report.error_rate:>7.1%}{marker}"
+        )
+    if saturation is None:
+        print(f"\nNo saturation up to the highest level (SLO: p95 <= {slo_p95}s)")
+    else:
+        print(f"\nSaturates at {saturation.level:g} {level_name} (SLO: p95 <= {slo_p95}s)")
+
+
+class StubRequest:
+    # Same attributes as googleapiclient's HttpRequest that api/youtube.py reads
+    method = "GET"
+
+    def __init__(self, response_factory, latency: float, uri: str):
+        self.response_factory = response_factory
+        self.latency = latency
+        self.uri = uri
+
+    def execute(self):
+        time.sleep(self.latency)
+        return self.response_factory()
+
+
+class StubYouTube:
+    """
+    Stands in for the googleapiclient YouTube resource and the transcript API.
+    """
+
+    def __init__(self, latency: float, transcript_segments: int, comments: int):
+        self.latency = latency
+        self.transcript_segments = transcript_segments
+        self.comments = comments
+
+    def videos(self):
+        return SimpleNamespace(list=self.list_videos)
+
+    def commentThreads(self):
+        return SimpleNamespace(list=self.list_comment_threads)
+
+    def list_videos(self, id: str, **kwargs):
+        snippet = {"title": f"Stub video {id}", "description": f"00:00 Intro\n01:00 Middle\n02:00 End\n{id}"}
+        return StubRequest(lambda: {"items": [{"snippet": snippet}]}, self.latency, f"stub://videos?id={id}")
+
+    def list_comment_threads(self, videoId: str, **kwargs):
+        def response():
+            words = random.Random(videoId)
+            items = [
+                {
+                    "snippet": {
+                        "topLevelComment": {
+                            "snippet": {
+                                "textDisplay": " ".join(words.choices(STUB_WORDS, k=20)),
+                                "likeCount": words.randint(0, 500),
+                                "publishedAt": "2024-01-01T00:00:00Z",
+                            }
+                        },
+                        "totalReplyCount": 0,
+                    }
+                }
+                for _ in range(self.comments)
+            ]
+            return {"items": items}
+
+        return StubRequest(response, self.latency, f"stub://commentThreads?videoId={videoId}")
+
+    def get_transcript(self, video_id: str, languages: list[str]):
+        time.sleep(self.latency)
+        # Different words for every video, otherwise they'd all be deduplicated into one summary
+        words = random.Random(video_id)
+        return [
+            {"text": " ".join(words.choices(STUB_WORDS, k=12)), "start": i * 4.0, "duration": 4.0}
+            for i in range(self.transcript_segments)
+        ]
+
+
+class StubOpenAI:
+    """
+    Answers chat completions with a valid function call for the summary and comment analysis schemas.
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, functions: list[dict], **kwargs):
+        time.sleep(self.latency)
+        if functions[0]["name"] == "analyze_and_cluster_comments":
+            arguments = {
+                "topics": [{"name": "Stub topic", "description": "Stub", "comment_indices": [0, 1]}],
+                "overall_analysis": "Stub analysis",
+            }
+        else:
+            point = {"emoji": "🧪", "title": "Stub point", "content": "Stub content", "quote": "Stub quote"}
+            arguments = {"summary": [point] * 3}
+        message = SimpleNamespace(function_call=SimpleNamespace(arguments=json.dumps(arguments)))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def start_stub_app(port: int, llm_latency: float, youtube_latency: float) -> str:
+    # Settings are read at import time, so the env has to be ready before the first eightify import
+    os.environ.setdefault("YOUTUBE_API_KEY", "stub")
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Measure the capacity of the app, not the per-client rate limit
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000")
+    os.environ.setdefault("RATE_LIMIT_BURST", "1000")
+    # Every run starts cold instead of reading what the previous run left on disk
+    os.environ.setdefault("USE_CORPUS", "false")
+
+    import uvicorn
+
+    from eightify.api import youtube
+    from eightify.api.llm.providers import LLMProvider, llm_router
+    from eightify.main import app
+
+    stub_youtube = StubYouTube(youtube_latency, transcript_segments=200, comments=50)
+    youtube.youtube = stub_youtube
+    youtube.YouTubeTranscriptApi = stub_youtube
+    llm_router.providers = [LLMProvider("stub", StubOpenAI(llm_latency))]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Backend to load; by default starts the app in-process with stub upstreams")
+    parser.add_argument("--port", type=int, default=8765, help="Port of the in-process app")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument(
+        "--levels", type=float, nargs="+", default=[1, 2, 4, 8, 16], help="Users (closed) or requests/s (open)"
+    )
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per level")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Pause between requests of a user (closed)")
+    parser.add_argument("--videos", type=int, default=200, help="Number of distinct videos")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent of video popularity")
+    parser.add_argument("--comments-ratio", type=float, default=0.3, help="Share of /analyze_comments requests")
+    parser.add_argument("--timeout", type=float, default=60, help="Client timeout, like the frontend's")
+    parser.add_argument("--slo-p95", type=float, default=10, help="p95 latency SLO in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Simulated LLM latency (stub mode)")
+    parser.add_argument("--youtube-latency", type=float, default=0.1, help="Simulated YouTube latency (stub mode)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    url = args.url or start_stub_app(args.port, args.llm_latency, args.youtube_latency)
+    workload = Workload(args.videos, args.zipf_s, args.comments_ratio, args.seed)
+
+    reports = []
+    for level in args.levels:
+        print(f"Running {args.mode} loop at {level:g} for {args.duration:g}s...")
+        if args.mode == "closed":
+            results = run_closed_loop(url, workload, int(level), args.duration, args.think_time, args.timeout)
+        else:
+            results = run_open_loop(url, workload, level, args.duration, args.timeout, args.seed)
+        reports.append(summarize_level(level, results, args.duration))
+
+    saturation = find_saturation(reports, args.slo_p95, args.max_error_rate)
+    print_report(reports, saturation, args.mode, args.slo_p95)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "config": vars(args),
+                    "levels": [asdict(report) for report in reports],
+                    "saturation": saturation.level if saturation else None,
+                },
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,65 @@
-from collections import defaultdict
+import asyncio
+import pstats
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
 from typing import Optional
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.datastructures import State
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response
 from loguru import logger
 from pydantic import BaseModel
 
+from eightify import profiling, rate_limit
 from eightify.api import llm, youtube
-from eightify.common import CommentAnalysis, VideoDetails, VideoTranscript
+from eightify.api.circuit_breaker import CircuitOpenError
+from eightify.api.llm import Priority
+from eightify.api.llm.providers import llm_router
+from eightify.api.llm.scheduler import llm_scheduler
+from eightify.cache import CacheEntry, StaleCache
+from eightify.chapters import parse_chapters
+from eightify.common import ChapterSummary, CommentAnalysis, VideoChapter, VideoDetails, VideoTranscript
 from eightify.config import config
+from eightify.corpus import (
+    CorpusStore,
+    iter_comments,
+    load_transcript,
+    load_video_details,
+    record_comments,
+    save_transcript,
+    save_video_details,
+)
+from eightify.fingerprint import FingerprintIndex, fingerprint
+from eightify.insight import canonical_insight_request, find_similar_request
+from eightify.sampling import sample_comments
+from eightify.transcript import clean_transcript
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Initialize the video_summaries, video_details, and transcripts in the app state
-    app.state.video_summaries = defaultdict(str)
+    # Initialize the caches for summaries, comment analyses, video_details, and transcripts in the app state
+    app.state.video_summaries = StaleCache[SummarizeResponse](ttl=config.summary_cache_ttl)
+    app.state.chapter_summaries = StaleCache[SummarizeResponse](ttl=config.summary_cache_ttl)
+    app.state.comment_analyses = StaleCache[CommentAnalysis](ttl=config.analysis_cache_ttl)
     app.state.video_details = {}
     app.state.transcripts = {}
+    app.state.transcript_index = FingerprintIndex()
+    app.state.transcript_fingerprints = {}
+    app.state.corpus = CorpusStore(config.corpus_dir) if config.use_corpus else None
     yield
     # Clean up resources if needed
     app.state.video_summaries.clear()
+    app.state.chapter_summaries.clear()
+    app.state.comment_analyses.clear()
     app.state.video_details.clear()
     app.state.transcripts.clear()
+    app.state.transcript_fingerprints.clear()
+    if app.state.corpus:
+        app.state.corpus.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -37,14 +72,45 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+app.middleware("http")(rate_limit.limit_requests)
+app.middleware("http")(profiling.profile_request)
 
 
 class VideoRequest(BaseModel):
     video_id: str
+    # Return a quick draft from the small model right away and refine it in the background
+    progressive: bool = False
+    # Summarize every chapter from the description separately (falls back to the usual summary without chapters)
+    chapters: bool = False
 
 
 class SummarizeResponse(BaseModel):
     summary: str
+    # True when the cached result is outdated and a fresh one is being generated in the background
+    stale: bool = False
+    # True while the summary is a draft from the small model and the refined one is being generated
+    draft: bool = False
+    # True when refining the draft failed; the next /summarize request for the video tries again
+    refine_failed: bool = False
+    chapters: list[ChapterSummary] = []
+    # Chapters whose summary failed and that the summary is missing; the next request tries again
+    skipped_chapters: list[VideoChapter] = []
+
+
+class RollupRequest(BaseModel):
+    # Either explicit videos, a playlist, or the uploads of a channel (optionally since a date)
+    video_ids: list[str] = []
+    playlist_id: Optional[str] = None
+    channel_id: Optional[str] = None
+    published_after: Optional[datetime] = None
+    title: Optional[str] = None
+
+
+class RollupResponse(BaseModel):
+    summary: str
+    video_ids: list[str]
+    # Videos that couldn't be summarized (no transcript etc.) and aren't part of the roll-up
+    skipped_video_ids: list[str] = []
 
 
 class CommentAnalysisRequest(BaseModel):
@@ -56,7 +122,49 @@ class CommentAnalysisResponse(BaseModel):
     comment_analysis: CommentAnalysis
 
 
+@app.exception_handler(youtube.YouTubeRequestError)
+async def youtube_request_error_handler(request: Request, exc: youtube.YouTubeRequestError):
+    # Same answer as for a video without comments, the frontend shows it as such
+    if exc.reason == "commentsDisabled":
+        return Response(status_code=204)
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(config.circuit_recovery_timeout))},
+    )
+
+
+# LLM calls wait for a scheduler slot and then for the API, both block: they run in worker threads so that
+# concurrent requests are actually concurrent and the loop keeps serving cached results. Not in the default
+# executor, whose few threads would be taken by whichever calls came first, whatever their priority
+llm_executor = ThreadPoolExecutor(max_workers=config.llm_worker_threads, thread_name_prefix="llm")
+
+
+async def run_llm_work(function, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(llm_executor, partial(function, *args, **kwargs))
+
+
+def raise_llm_failure(result_name: str):
+    if llm_router.is_open:
+        raise HTTPException(
+            status_code=503,
+            detail=f"LLM api is unavailable, can't generate a {result_name}",
+            headers={"Retry-After": str(int(config.circuit_recovery_timeout))},
+        )
+    raise HTTPException(status_code=500, detail=f"LLM api failed to generate a {result_name}")
+
+
 async def fetch_data(video_id: str, app_state: State, data_type: str, fetch_function) -> VideoDetails | VideoTranscript:
+    # Upstream calls block, keep them off the event loop
+    return await asyncio.to_thread(load_data, video_id, app_state, data_type, fetch_function)
+
+
+def load_data(video_id: str, app_state: State, data_type: str, fetch_function) -> VideoDetails | VideoTranscript:
     data_state = getattr(app_state, data_type)
 
     if video_id not in data_state:
@@ -68,63 +176,531 @@ async def fetch_data(video_id: str, app_state: State, data_type: str, fetch_func
     return data_state[video_id]
 
 
+def get_video_details(video_id: str, corpus: CorpusStore | None = None) -> VideoDetails | None:
+    video_details = load_video_details(corpus, video_id) if corpus else None
+    if video_details is None:
+        video_details = youtube.get_video_details(video_id)
+        if video_details is not None and corpus:
+            save_video_details(corpus, video_id, video_details)
+    return video_details
+
+
 async def fetch_video_details(video_id: str, app_state: State) -> VideoDetails:
-    return await fetch_data(video_id, app_state, "video_details", youtube.get_video_details)
+    return await fetch_data(video_id, app_state, "video_details", partial(get_video_details, corpus=app_state.corpus))
+
+
+def get_clean_video_transcript(video_id: str, corpus: CorpusStore | None = None) -> VideoTranscript | None:
+    # The corpus keeps the raw transcript, so a better cleanup applies to already fetched videos too
+    transcript = load_transcript(corpus, video_id) if corpus else None
+    if transcript is None:
+        transcript = youtube.get_video_transcript(video_id)
+        if transcript is not None and corpus:
+            save_transcript(corpus, video_id, transcript)
+
+    if transcript is None or not config.clean_transcripts:
+        return transcript
+
+    cleaned, report = clean_transcript(transcript)
+    logger.info(
+        f"Cleaned transcript for {video_id}: ~{report.original_tokens} -> ~{report.cleaned_tokens} tokens "
+        f"({report.reduction:.0%} smaller), {report.original_segments} -> {report.cleaned_segments} segments"
+    )
+    return cleaned
 
 
 async def fetch_video_transcript(video_id: str, app_state: State) -> VideoTranscript:
-    return await fetch_data(video_id, app_state, "transcripts", youtube.get_video_transcript)
+    return await fetch_data(
+        video_id, app_state, "transcripts", partial(get_clean_video_transcript, corpus=app_state.corpus)
+    )
+
+
+def generate_summary(
+    video_details: VideoDetails,
+    transcript: VideoTranscript,
+    priority: Priority = Priority.INTERACTIVE,
+    model: str | None = None,
+) -> str | None:
+    # TODO: use async APIs
+    return llm.summarize_text(
+        transcript=transcript,
+        video_title=video_details.title,
+        video_description=video_details.description,
+        priority=priority,
+        model=model,
+    )
+
+
+def refresh_summary(
+    video_id: str,
+    app_state: State,
+    video_details: VideoDetails,
+    transcript: VideoTranscript,
+    priority: Priority = Priority.BACKGROUND,
+):
+    try:
+        summary = generate_summary(video_details, transcript, priority)
+        if summary is None:
+            logger.warning(f"Failed to refresh the summary for {video_id}, keeping the old one")
+            cached = app_state.video_summaries.get(video_id)
+            if cached and cached.value.draft:
+                # Tell the pollers to stop waiting for a refined summary
+                cached.value = cached.value.model_copy(update={"refine_failed": True})
+            return
+        app_state.video_summaries.set(video_id, SummarizeResponse(summary=summary))
+    finally:
+        app_state.video_summaries.finish_refresh(video_id)
+
+
+def schedule_summary_refresh(
+    video_id: str,
+    app_state: State,
+    background_tasks: BackgroundTasks,
+    video_details: VideoDetails,
+    transcript: VideoTranscript,
+    is_draft: bool,
+):
+    if not app_state.video_summaries.start_refresh(video_id):
+        return
+    cached = app_state.video_summaries.get(video_id)
+    if cached and cached.value.refine_failed:
+        cached.value = cached.value.model_copy(update={"refine_failed": False})
+    # Somebody is looking at the draft right now, so refining it is interactive work
+    priority = Priority.INTERACTIVE if is_draft else Priority.BACKGROUND
+    background_tasks.add_task(refresh_summary, video_id, app_state, video_details, transcript, priority)
+
+
+def generate_chapter_summary(
+    video_details: VideoDetails,
+    transcript: VideoTranscript,
+    chapters: list[VideoChapter],
+    priority: Priority = Priority.INTERACTIVE,
+) -> SummarizeResponse | None:
+    result = llm.summarize_chapters(transcript, video_details, chapters, priority)
+    if result is None:
+        return None
+    summary, chapter_summaries, skipped_chapters = result
+    return SummarizeResponse(summary=summary, chapters=chapter_summaries, skipped_chapters=skipped_chapters)
+
+
+def store_chapter_summary(video_id: str, app_state: State, result: SummarizeResponse) -> None:
+    # A summary with missing chapters is served, but as stale, so the next request retries it in the background
+    created_at = 0.0 if result.skipped_chapters else None
+    app_state.chapter_summaries.set(video_id, result, created_at=created_at)
+
+
+def refresh_chapter_summary(
+    video_id: str,
+    app_state: State,
+    video_details: VideoDetails,
+    transcript: VideoTranscript,
+    chapters: list[VideoChapter],
+):
+    try:
+        result = generate_chapter_summary(video_details, transcript, chapters, Priority.BACKGROUND)
+        cached = app_state.chapter_summaries.get(video_id)
+        if result is None or (result.skipped_chapters and cached and not cached.value.skipped_chapters):
+            logger.warning(f"Failed to refresh the chapter summary for {video_id}, keeping the old one")
+            return
+        store_chapter_summary(video_id, app_state, result)
+    finally:
+        app_state.chapter_summaries.finish_refresh(video_id)
+
+
+async def summarize_video_by_chapters(
+    video_id: str,
+    app_state: State,
+    background_tasks: BackgroundTasks,
+    video_details: VideoDetails,
+    transcript: VideoTranscript,
+    chapters: list[VideoChapter],
+) -> SummarizeResponse:
+    cached = app_state.chapter_summaries.get(video_id)
+    if cached and not app_state.chapter_summaries.is_stale(cached):
+        return cached.value
+
+    if cached:
+        if app_state.chapter_summaries.start_refresh(video_id):
+            background_tasks.add_task(refresh_chapter_summary, video_id, app_state, video_details, transcript, chapters)
+        return cached.value.model_copy(update={"stale": True})
+
+    # A call per chapter in parallel, then the merge
+    rate_limit.check_admission(Priority.INTERACTIVE, calls=len(chapters) + 1, depth=2)
+    result = await run_llm_work(generate_chapter_summary, video_details, transcript, chapters)
+    if result is None:
+        raise_llm_failure("chapter summary")
+
+    store_chapter_summary(video_id, app_state, result)
+    return result
+
+
+def find_duplicate_summary(
+    video_id: str, app_state: State, transcript: VideoTranscript
+) -> CacheEntry[SummarizeResponse] | None:
+    """
+    Reuse the summary of another upload with the same transcript (re-uploads, mirrors, clips of a talk).
+    Fingerprinting a long transcript takes a while, call it from a worker thread.
+    """
+    fp = app_state.transcript_fingerprints.get(video_id)
+    if fp is None:
+        fp = app_state.transcript_fingerprints[video_id] = fingerprint(transcript.text)
+        app_state.transcript_index.add(fp, video_id)
+
+    for duplicate_id in app_state.transcript_index.find(fp):
+        duplicate = app_state.video_summaries.get(duplicate_id)
+        if duplicate_id != video_id and duplicate and not duplicate.value.draft:
+            logger.info(f"Reusing the summary of {duplicate_id} for {video_id}, their transcripts match")
+            return duplicate
+    return None
+
+
+def reuse_duplicate_summary(video_id: str, app_state: State, duplicate: CacheEntry[SummarizeResponse]) -> None:
+    # As old as the original: a copy mustn't be fresh for another TTL when the original is about to expire
+    app_state.video_summaries.set(video_id, duplicate.value, created_at=duplicate.created_at)
 
 
 @app.post("/summarize", response_model=SummarizeResponse)
-async def summarize_video(request: VideoRequest, fastapi_request: Request):
+async def summarize_video(request: VideoRequest, fastapi_request: Request, background_tasks: BackgroundTasks):
     video_id = request.video_id
     app_state = fastapi_request.app.state
 
+    if request.chapters:
+        video_details = await fetch_video_details(video_id, app_state)
+        transcript = await fetch_video_transcript(video_id, app_state)
+        chapters = parse_chapters(video_details.description)
+        if chapters and transcript.segments:
+            return await summarize_video_by_chapters(
+                video_id, app_state, background_tasks, video_details, transcript, chapters
+            )
+        logger.info(f"No chapters found for {video_id}, summarizing the whole video")
+
+    cached = app_state.video_summaries.get(video_id)
+    is_stale = cached is not None and app_state.video_summaries.is_stale(cached)
+    if cached and not cached.value.draft and not is_stale:
+        return cached.value
+
     video_details = await fetch_video_details(video_id, app_state)
     transcript = await fetch_video_transcript(video_id, app_state)
 
-    # TODO: use async APIs
-    summary = llm.summarize_text(
-        transcript=transcript,
-        video_title=video_details.title,
-        video_description=video_details.description,
-    )
+    if cached:
+        # Serve the draft or the last good result right away and refine/revalidate it in the background
+        schedule_summary_refresh(
+            video_id, app_state, background_tasks, video_details, transcript, is_draft=cached.value.draft
+        )
+        return cached.value.model_copy(update={"stale": is_stale})
+
+    duplicate = await asyncio.to_thread(find_duplicate_summary, video_id, app_state, transcript)
+    if duplicate is not None:
+        reuse_duplicate_summary(video_id, app_state, duplicate)
+        if app_state.video_summaries.is_stale(duplicate):
+            schedule_summary_refresh(video_id, app_state, background_tasks, video_details, transcript, is_draft=False)
+            return duplicate.value.model_copy(update={"stale": True})
+        return duplicate.value
+
+    # Progressive: the draft, then the refinement the user is waiting for
+    calls = 2 if request.progressive else 1
+    rate_limit.check_admission(Priority.INTERACTIVE, calls=calls, depth=calls)
+
+    if request.progressive:
+        draft = await run_llm_work(generate_summary, video_details, transcript, model=config.draft_llm_model)
+        if draft is not None:
+            result = SummarizeResponse(summary=draft, draft=True)
+            app_state.video_summaries.set(video_id, result)
+            schedule_summary_refresh(video_id, app_state, background_tasks, video_details, transcript, is_draft=True)
+            return result
+        logger.warning(f"Failed to generate a draft summary for {video_id}, falling back to the main model")
+
+    summary = await run_llm_work(generate_summary, video_details, transcript)
     if summary is None:
-        raise HTTPException(status_code=500, detail="LLM api failed to generate a summary")
+        raise_llm_failure("summary")
 
     # Store the summary in FastAPI state
-    app_state.video_summaries[video_id] = summary
+    result = SummarizeResponse(summary=summary)
+    app_state.video_summaries.set(video_id, result)
 
-    return SummarizeResponse(summary=summary)
+    return result
 
 
-@app.post("/analyze_comments", response_model=CommentAnalysis)
-async def analyze_video_comments(request: CommentAnalysisRequest, fastapi_request: Request):
-    video_id = request.video_id
-    app_state = fastapi_request.app.state
+rollup_executor = ThreadPoolExecutor(max_workers=config.rollup_concurrency, thread_name_prefix="rollup")
+
+
+def summarize_for_rollup(video_id: str, app_state: State) -> tuple[VideoDetails, str] | None:
+    """
+    Cached summary of the video, or a new one if there's none yet. Runs in a worker thread.
+    """
     try:
-        video_summary = app_state.video_summaries.get(video_id)
-        video_details = await fetch_video_details(video_id, app_state)
-    except KeyError:
-        raise HTTPException(status_code=404, detail="analyze_comments should be called after summarize_video")
+        video_details = load_data(
+            video_id, app_state, "video_details", partial(get_video_details, corpus=app_state.corpus)
+        )
+        cached = app_state.video_summaries.get(video_id)
+        if cached and not cached.value.draft:
+            return video_details, cached.value.summary
+
+        transcript = load_data(
+            video_id, app_state, "transcripts", partial(get_clean_video_transcript, corpus=app_state.corpus)
+        )
+        duplicate = find_duplicate_summary(video_id, app_state, transcript)
+        if duplicate is not None:
+            reuse_duplicate_summary(video_id, app_state, duplicate)
+            return video_details, duplicate.value.summary
+
+        summary = generate_summary(video_details, transcript, Priority.ROLLUP)
+        if summary is None:
+            return None
+        app_state.video_summaries.set(video_id, SummarizeResponse(summary=summary))
+        return video_details, summary
+    except (HTTPException, CircuitOpenError, youtube.YouTubeRequestError) as e:
+        logger.warning(f"Skipping {video_id} in the roll-up: {e}")
+        return None
+
+
+async def resolve_rollup_videos(request: RollupRequest) -> list[str]:
+    video_ids = list(request.video_ids)
+    playlist_id = request.playlist_id
+    if request.channel_id:
+        playlist_id = await asyncio.to_thread(youtube.get_channel_uploads_playlist, request.channel_id)
+        if playlist_id is None:
+            raise HTTPException(status_code=404, detail="Channel not found")
+    if playlist_id:
+        try:
+            video_ids += await asyncio.to_thread(
+                youtube.get_playlist_video_ids, playlist_id, config.rollup_max_videos, request.published_after
+            )
+        except youtube.YouTubeRequestError as e:
+            # Unknown or private playlist
+            raise HTTPException(status_code=404, detail="Playlist not found") from e
+    # Keep the order, drop repeats
+    return list(dict.fromkeys(video_ids))[: config.rollup_max_videos]
+
+
+@app.post("/rollup", response_model=RollupResponse)
+async def rollup_videos(request: RollupRequest, fastapi_request: Request):
+    """
+    One summary for a playlist, a channel or a list of videos, built from the per-video summaries.
+    """
+    app_state = fastapi_request.app.state
+    video_ids = await resolve_rollup_videos(request)
+    if not video_ids:
+        raise HTTPException(status_code=404, detail="No videos to roll up")
+
+    # Cached summaries come back right away, the missing ones are generated concurrently. In their own pool,
+    # so a roll-up of dozens of videos doesn't take every thread the other endpoints run their calls in
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(rollup_executor, summarize_for_rollup, video_id, app_state) for video_id in video_ids)
+    )
+    summarized = [(video_id, result) for video_id, result in zip(video_ids, results) if result is not None]
+    if not summarized:
+        raise_llm_failure("summary for any of the videos")
+
+    title = request.title or request.playlist_id or request.channel_id or "Selected videos"
+    summary, merged = await run_llm_work(
+        llm.rollup_summaries,
+        [summary for _, (_, summary) in summarized],
+        title,
+        [details.title for _, (details, _) in summarized],
+    )
+    if summary is None:
+        raise_llm_failure("roll-up summary")
+
+    # Videos whose summary was lost in a failed merge are skipped too
+    rolled_up_ids = [summarized[i][0] for i in merged]
+    return RollupResponse(
+        summary=summary,
+        video_ids=rolled_up_ids,
+        skipped_video_ids=[video_id for video_id in video_ids if video_id not in rolled_up_ids],
+    )
+
 
-    comments = youtube.get_video_comments(video_id)
+@app.get("/summary/{video_id}", response_model=SummarizeResponse)
+async def get_summary(video_id: str, fastapi_request: Request):
+    """
+    Cached summary without generating anything, used to poll for the refined version of a draft.
+    """
+    video_summaries = fastapi_request.app.state.video_summaries
+    cached = video_summaries.get(video_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Summary not found")
+    return cached.value.model_copy(update={"stale": video_summaries.is_stale(cached)})
+
+
+def insight_cache_key(video_id: str, app_state: State, insight_request: str | None) -> tuple[str, str | None]:
+    """
+    Differently worded requests for the same thing share a cache entry: the key is the request's content words,
+    or those of an already cached request for the video that's similar enough.
+    """
+    canonical = canonical_insight_request(insight_request)
+    if canonical is None:
+        return video_id, None
+    known = [key[1] for key in app_state.comment_analyses.keys() if key[0] == video_id and key[1] is not None]
+    return video_id, find_similar_request(canonical, known) or canonical
+
+
+def generate_comment_analysis(
+    video_id: str,
+    app_state: State,
+    video_details: VideoDetails,
+    insight_request: str | None,
+    priority: Priority = Priority.COMMENTS,
+    refetch_comments: bool = False,
+) -> CommentAnalysis | None:
+    """
+    Full analysis of the comments without an insight request, otherwise a focused pass over the cached full one.
+    """
+    if canonical_insight_request(insight_request) is None:
+        return generate_base_comment_analysis(video_id, app_state, video_details, priority, refetch_comments)
+
+    base = get_base_comment_analysis(video_id, app_state, video_details, priority, refresh_stale=refetch_comments)
+    if base is None:
+        return None
+    return llm.focus_comment_analysis(base, video_details, insight_request, priority)
+
+
+def get_base_comment_analysis(
+    video_id: str, app_state: State, video_details: VideoDetails, priority: Priority, refresh_stale: bool = False
+) -> CommentAnalysis | None:
+    base_key = (video_id, None)
+    cached = app_state.comment_analyses.get(base_key)
+    if cached and not (refresh_stale and app_state.comment_analyses.is_stale(cached)):
+        return cached.value
+
+    base = generate_base_comment_analysis(
+        video_id, app_state, video_details, priority, refetch_comments=cached is not None
+    )
+    if base is not None:
+        app_state.comment_analyses.set(base_key, base)
+    return base
+
+
+def generate_base_comment_analysis(
+    video_id: str,
+    app_state: State,
+    video_details: VideoDetails,
+    priority: Priority = Priority.COMMENTS,
+    refetch_comments: bool = False,
+) -> CommentAnalysis | None:
+    corpus = app_state.corpus
+    harvest = iter_comments(corpus, video_id) if corpus and not refetch_comments else None
+    if harvest is None:
+        harvest = youtube.iter_video_comments(video_id)
+        if corpus:
+            harvest = record_comments(corpus, video_id, harvest)
+
+    comments = sample_comments(harvest, seed=f"{config.comment_sample_seed}:{video_id}")
     if len(comments) == 0:
         raise HTTPException(status_code=204, detail="No comments found")
 
-    analysis_result = llm.analyze_and_cluster_comments(
+    summary = app_state.video_summaries.get(video_id)
+    return llm.analyze_and_cluster_comments(
         comments=comments,
         video_details=video_details,
-        summary=video_summary,
-        insight_request=request.insight_request,
+        summary=summary.value.summary if summary else None,
+        priority=priority,
+    )
+
+
+def refresh_comment_analysis(
+    video_id: str,
+    app_state: State,
+    video_details: VideoDetails,
+    cache_key: tuple[str, str | None],
+    insight_request: str | None,
+):
+    try:
+        # Revalidation is when new comments should get a chance to be analyzed
+        analysis_result = generate_comment_analysis(
+            video_id, app_state, video_details, insight_request, Priority.BACKGROUND, refetch_comments=True
+        )
+        if analysis_result is None:
+            logger.warning(f"Failed to refresh the stale comment analysis for {cache_key}, keeping the old one")
+            return
+        app_state.comment_analyses.set(cache_key, analysis_result)
+    except (HTTPException, CircuitOpenError, youtube.YouTubeRequestError) as e:
+        logger.warning(f"Failed to refresh the stale comment analysis for {cache_key}: {e}")
+    finally:
+        app_state.comment_analyses.finish_refresh(cache_key)
+
+
+@app.post("/analyze_comments", response_model=CommentAnalysis)
+async def analyze_video_comments(
+    request: CommentAnalysisRequest, fastapi_request: Request, background_tasks: BackgroundTasks
+):
+    video_id = request.video_id
+    app_state = fastapi_request.app.state
+    cache_key = insight_cache_key(video_id, app_state, request.insight_request)
+
+    cached = app_state.comment_analyses.get(cache_key)
+    if cached and not app_state.comment_analyses.is_stale(cached):
+        return cached.value
+
+    video_details = await fetch_video_details(video_id, app_state)
+
+    if cached:
+        if app_state.comment_analyses.start_refresh(cache_key):
+            background_tasks.add_task(
+                refresh_comment_analysis, video_id, app_state, video_details, cache_key, request.insight_request
+            )
+        return cached.value.model_copy(update={"stale": True})
+
+    # An insight request is a focused pass over the base analysis, which may have to be made first
+    needs_base = cache_key[1] is not None and (video_id, None) not in app_state.comment_analyses
+    calls = 2 if needs_base else 1
+    rate_limit.check_admission(Priority.COMMENTS, calls=calls, depth=calls)
+    analysis_result = await run_llm_work(
+        generate_comment_analysis, video_id, app_state, video_details, request.insight_request
     )
     if analysis_result is None:
-        raise HTTPException(status_code=500, detail="LLM api failed to generate a comment analysis")
+        raise_llm_failure("comment analysis")
+
+    app_state.comment_analyses.set(cache_key, analysis_result)
 
     return analysis_result
 
 
+@app.get("/admin/llm_scheduler")
+async def llm_scheduler_stats():
+    return llm_scheduler.stats()
+
+
+@app.get("/admin/llm_providers")
+async def llm_provider_stats():
+    return llm_router.stats()
+
+
+@app.get("/admin/corpus")
+async def corpus_stats(fastapi_request: Request):
+    corpus = fastapi_request.app.state.corpus
+    if corpus is None:
+        raise HTTPException(status_code=404, detail="Corpus is disabled")
+    return corpus.stats()
+
+
+@app.post("/admin/corpus/compact")
+def compact_corpus(fastapi_request: Request):
+    corpus = fastapi_request.app.state.corpus
+    if corpus is None:
+        raise HTTPException(status_code=404, detail="Corpus is disabled")
+    corpus.compact()
+    return corpus.stats()
+
+
+@app.get("/admin/profiles")
+async def list_profiles():
+    return profiling.list_profiles()
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str, raw: bool = False, sort_by: pstats.SortKey = pstats.SortKey.CUMULATIVE, limit: int = 50
+):
+    path = profiling.get_profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if raw:
+        # Open with snakeviz, pstats etc.
+        return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+    return PlainTextResponse(profiling.format_profile(path, sort_by=sort_by, limit=limit))
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Eightify API — a tool for generating insights from YouTube videos."}
@@ -0,0 +1,93 @@
+import cProfile
+import io
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from fastapi import Request
+from loguru import logger
+
+from eightify.config import config
+
+PROFILE_HEADER = "X-Eightify-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_ID_PATTERN = re.compile(r"^[\w-]+$")
+
+# Only one cProfile profiler can be active at a time
+_profiler_lock = threading.Lock()
+
+
+def should_profile(request: Request) -> bool:
+    if config.profile_allow_header and request.headers.get(PROFILE_HEADER) == "1":
+        return True
+    return config.profile_sample_rate > 0 and random.random() < config.profile_sample_rate
+
+
+async def profile_request(request: Request, call_next):
+    """
+    HTTP middleware: profiles the request with cProfile when it's asked for with the header or sampled.
+    When profiling is off, the cost is one header lookup and one float comparison.
+
+    The profiler sees the event loop thread only: work the endpoints hand off to worker threads (upstream and
+    LLM calls) shows up as time spent awaiting it. Concurrently served requests aren't isolated either,
+    so profile under low traffic.
+    """
+    if not should_profile(request) or not _profiler_lock.acquire(blocking=False):
+        return await call_next(request)
+
+    profiler = cProfile.Profile()
+    started_at = time.perf_counter()
+    try:
+        profiler.enable()
+        response = await call_next(request)
+    finally:
+        profiler.disable()
+        _profiler_lock.release()
+
+    profile_id = save_profile(profiler, request.url.path)
+    logger.info(f"Profiled {request.url.path} in {time.perf_counter() - started_at:.2f}s, profile id: {profile_id}")
+    response.headers[PROFILE_ID_HEADER] = profile_id
+    return response
+
+
+def save_profile(profiler: cProfile.Profile, path: str) -> str:
+    profile_dir = Path(config.profile_dir)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+
+    endpoint = path.strip("/").replace("/", "_") or "root"
+    profile_id = f"{int(time.time())}-{endpoint}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(profile_dir / f"{profile_id}.prof")
+
+    # Keep only the latest profiles
+    for old_profile in sorted(profile_dir.glob("*.prof"))[: -config.profile_max_files]:
+        old_profile.unlink(missing_ok=True)
+
+    return profile_id
+
+
+def list_profiles() -> list[dict]:
+    profile_dir = Path(config.profile_dir)
+    if not profile_dir.exists():
+        return []
+    return [
+        {"id": path.stem, "size": path.stat().st_size, "created_at": path.stat().st_mtime}
+        for path in sorted(profile_dir.glob("*.prof"), reverse=True)
+    ]
+
+
+def get_profile_path(profile_id: str) -> Path | None:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    path = Path(config.profile_dir) / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def format_profile(path: Path, sort_by: pstats.SortKey = pstats.SortKey.CUMULATIVE, limit: int = 50) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.sort_stats(sort_by).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,126 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from loguru import logger
+
+from eightify.api.llm.scheduler import Priority, llm_scheduler
+from eightify.config import config
+
+CLIENT_ID_HEADER = "X-Client-Id"
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+# Endpoints that may end up calling the LLM, with the priority their calls get
+RATE_LIMITED_PATHS = {
+    "/summarize": Priority.INTERACTIVE,
+    "/analyze_comments": Priority.COMMENTS,
+    "/rollup": Priority.ROLLUP,
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def acquire(self) -> float:
+        """
+        Take a token. Returns 0 on success or the number of seconds until a token is available.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    One token bucket per client. Only the `max_clients` most recently seen clients are remembered;
+    a forgotten client comes back with a full bucket, which is fine for abuse protection.
+    """
+
+    def __init__(
+        self,
+        per_minute: float = config.rate_limit_per_minute,
+        burst: int = config.rate_limit_burst,
+        max_clients: int = config.rate_limit_max_clients,
+    ):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client_id: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_id)
+            return bucket.acquire()
+
+
+rate_limiter = RateLimiter()
+
+
+def get_client_id(request: Request) -> str:
+    host = request.client.host if request.client else "unknown"
+    # Our own Streamlit frontend calls the backend from the same machine on behalf of many users,
+    # so it tells us which browser session the request is for. Unless the machine is also our reverse proxy:
+    # then loopback requests come from anyone, who could pick a new id for every request
+    if host in LOOPBACK_HOSTS and host not in config.trusted_proxies and CLIENT_ID_HEADER in request.headers:
+        return f"session:{request.headers[CLIENT_ID_HEADER]}"
+    # Anyone can send X-Forwarded-For, a new value per request would mean a new bucket per request
+    forwarded_for = request.headers.get("X-Forwarded-For")
+    if host in config.trusted_proxies and forwarded_for:
+        # Every proxy appends the address it got the request from: the last one that isn't ours is the client
+        for address in reversed([address.strip() for address in forwarded_for.split(",")]):
+            if address not in config.trusted_proxies:
+                return address
+    return host
+
+
+async def limit_requests(request: Request, call_next):
+    """
+    HTTP middleware: per-client token bucket for the endpoints that call the LLM.
+    """
+    if request.method != "POST" or request.url.path not in RATE_LIMITED_PATHS:
+        return await call_next(request)
+
+    client_id = get_client_id(request)
+    retry_after = rate_limiter.acquire(client_id)
+    if retry_after > 0:
+        logger.warning(f"Rate limited {client_id} on {request.url.path}")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Too many requests, slow down a bit"},
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    return await call_next(request)
+
+
+def check_admission(priority: Priority, calls: int = 1, depth: int = 1) -> None:
+    """
+    Reject new LLM work upfront if, given what's already queued, it can't finish before the client gives up.
+    Called right before generating, so cached results are served regardless of the load.
+    `calls` and `depth` describe the work as in `LLMScheduler.estimate_completion`.
+    """
+    estimated = llm_scheduler.estimate_completion(priority, calls, depth)
+    if estimated > config.request_deadline:
+        logger.warning(f"Rejecting {priority.value} LLM work, estimated completion in {estimated:.1f}s")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is too busy to answer in time, please retry later",
+            headers={"Retry-After": str(math.ceil(estimated - config.request_deadline))},
+        )
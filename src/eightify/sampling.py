@@ -0,0 +1,121 @@
+import hashlib
+import heapq
+import math
+from datetime import datetime, timezone
+from typing import Iterable
+
+from loguru import logger
+
+from eightify.common import VideoComment
+from eightify.config import config
+from eightify.utils import estimate_tokens
+
+LIKE_BUCKETS = (1, 10, 100)
+RECENCY_BUCKETS_DAYS = (7, 30, 365)
+
+Stratum = tuple[int, int, int]
+
+
+def comment_stratum(comment: VideoComment, now: datetime) -> Stratum:
+    """
+    (likes bucket, recency bucket, thread role), where role is: lonely top-level comment,
+    top-level comment that started a discussion, or a reply.
+    """
+    likes = sum(comment.like_count >= bound for bound in LIKE_BUCKETS)
+
+    if comment.published_at is None:
+        recency = len(RECENCY_BUCKETS_DAYS)
+    else:
+        age_days = (now - comment.published_at).days
+        recency = sum(age_days >= bound for bound in RECENCY_BUCKETS_DAYS)
+
+    role = 2 if comment.is_reply else int(comment.reply_count > 0)
+    return likes, recency, role
+
+
+def sampling_key(comment: VideoComment, seed: str) -> float:
+    """
+    Weighted reservoir key (Efraimidis-Spirakis): u ** (1 / weight), with liked comments weighing more.
+    `u` comes from a hash instead of an RNG, so the sample depends only on the comments and the seed —
+    not on the order YouTube returned them in.
+    """
+    digest = hashlib.blake2b(f"{seed}\0{comment.text}\0{comment.published_at}".encode(), digest_size=8).digest()
+    u = (int.from_bytes(digest, "big") + 1) / (2**64 + 1)
+    weight = 1 + math.log1p(comment.like_count)
+    return u ** (1 / weight)
+
+
+def sample_comments(
+    comments: Iterable[VideoComment],
+    token_budget: int = config.comment_token_budget,
+    max_comments: int = config.max_number_of_comments,
+    seed: str = str(config.comment_sample_seed),
+    reservoir_size: int = config.comment_reservoir_size,
+    now: datetime | None = None,
+) -> list[VideoComment]:
+    """
+    Pick a representative, token-budgeted subset of a comment stream in bounded memory.
+
+    Every stratum (likes × recency × thread role) keeps its own weighted reservoir of `reservoir_size` comments,
+    so memory doesn't grow with the comment section. The budget and the count cap are then split between strata
+    proportionally to the square root of their size: big strata still get the most room, but rare ones (very liked, fresh, replies)
+    aren't crowded out the way they are in YouTube's top-N.
+
+    `now` defaults to the start of the current UTC day, so that the sample for the same seed is stable within a day
+    and can be cached.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    reservoirs: dict[Stratum, list[tuple[float, int, VideoComment]]] = {}
+    population: dict[Stratum, int] = {}
+    seen = 0
+
+    for comment in comments:
+        stratum = comment_stratum(comment, now)
+        population[stratum] = population.get(stratum, 0) + 1
+        reservoir = reservoirs.setdefault(stratum, [])
+        # `seen` breaks ties so that comments themselves are never compared
+        item = (sampling_key(comment, seed), seen, comment)
+        if len(reservoir) < reservoir_size:
+            heapq.heappush(reservoir, item)
+        elif item[0] > reservoir[0][0]:
+            heapq.heapreplace(reservoir, item)
+        seen += 1
+
+    total_weight = sum(math.sqrt(count) for count in population.values())
+    candidates = {stratum: sorted(reservoir, reverse=True) for stratum, reservoir in reservoirs.items()}
+    selected: list[tuple[float, int, VideoComment]] = []
+    leftovers: list[tuple[float, int, VideoComment]] = []
+    tokens_used = 0
+
+    for stratum in sorted(candidates):
+        share = math.sqrt(population[stratum]) / total_weight
+        # The count cap is split the same way as the budget, otherwise the strata visited first take it all
+        token_quota, count_quota = token_budget * share, max(1.0, max_comments * share)
+        stratum_tokens, stratum_count = 0, 0
+        for item in candidates[stratum]:
+            tokens = estimate_tokens(item[2].text)
+            if (
+                stratum_tokens + tokens <= token_quota
+                and stratum_count + 1 <= count_quota
+                and len(selected) < max_comments
+            ):
+                selected.append(item)
+                stratum_tokens += tokens
+                stratum_count += 1
+            else:
+                leftovers.append(item)
+        tokens_used += stratum_tokens
+
+    # Spend what's left of the budget on the best remaining candidates across all strata
+    for item in sorted(leftovers, reverse=True):
+        tokens = estimate_tokens(item[2].text)
+        if len(selected) >= max_comments:
+            break
+        if tokens_used + tokens <= token_budget:
+            selected.append(item)
+            tokens_used += tokens
+
+    logger.debug(f"Sampled {len(selected)} of {seen} comments from {len(population)} strata, ~{tokens_used} tokens")
+    return [comment for _, _, comment in sorted(selected, reverse=True)]
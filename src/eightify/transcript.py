@@ -0,0 +1,81 @@
+import re
+from dataclasses import dataclass
+
+from eightify.common import TranscriptSegment, VideoTranscript
+from eightify.utils import estimate_tokens
+
+# [Music], [Applause], (laughter), ♪ lyrics markers ♪, >> speaker change
+NON_SPEECH = re.compile(
+    r"\[[^\]]*\]|\((?:[^)]*\b(?:music|applause|laughter|laughs|inaudible|silence|cheering)\b[^)]*)\)|[♪♫]+|>>",
+    re.IGNORECASE,
+)
+FILLERS = re.compile(r"\b(?:u+m+|u+h+|e+r+m*|a+h+|h+m+|m+h+m+|mm+)\b[,.]?", re.IGNORECASE)
+# "the the the" -> "the". Only short function words repeated verbatim: "that that", "had had" or "very very"
+# are often meant, and so is "The the" across a sentence boundary
+STUTTER_WORDS = ("a", "an", "the", "I", "and", "but", "to", "of", "we", "you", "it", "my", "they")
+STUTTERS = re.compile(rf"\b({'|'.join(STUTTER_WORDS)})(?:\s+\1\b)+")
+WHITESPACE = re.compile(r"\s+")
+
+# Auto-generated captions repeat the tail of the previous window at the start of the next one.
+# A single matching word at a boundary is usually just speech ("... and" / "and ..."), so it takes two
+MIN_OVERLAP_WORDS = 2
+MAX_OVERLAP_WORDS = 12
+
+
+@dataclass
+class CleanupReport:
+    original_tokens: int
+    cleaned_tokens: int
+    original_segments: int
+    cleaned_segments: int
+
+    @property
+    def reduction(self) -> float:
+        return 1 - self.cleaned_tokens / self.original_tokens if self.original_tokens else 0.0
+
+
+def clean_text(text: str) -> str:
+    text = NON_SPEECH.sub(" ", text)
+    text = FILLERS.sub(" ", text)
+    text = STUTTERS.sub(r"\1", text)
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def overlap_length(previous_words: list[str], words: list[str]) -> int:
+    """
+    Number of leading `words` that repeat the end of `previous_words`.
+    """
+    for length in range(min(len(previous_words), len(words), MAX_OVERLAP_WORDS), MIN_OVERLAP_WORDS - 1, -1):
+        if [word.lower() for word in previous_words[-length:]] == [word.lower() for word in words[:length]]:
+            return length
+    return 0
+
+
+def clean_transcript(transcript: VideoTranscript) -> tuple[VideoTranscript, CleanupReport]:
+    """
+    Drop non-speech tags, fillers, stutters and overlapping caption windows before the transcript goes to the LLM.
+
+    Every kept segment still has the start and duration of the caption it came from,
+    so chapters and timestamps keep working on the cleaned transcript.
+    """
+    segments = transcript.segments or [TranscriptSegment(text=point, start=0.0) for point in transcript.points]
+
+    cleaned_segments: list[TranscriptSegment] = []
+    previous_words: list[str] = []
+    for segment in segments:
+        words = clean_text(segment.text).split(" ")
+        words = words[overlap_length(previous_words, words) :]
+        if not words or words == [""]:
+            continue
+        cleaned_segments.append(segment.model_copy(update={"text": " ".join(words)}))
+        previous_words = words
+
+    points = [segment.text for segment in cleaned_segments]
+    cleaned = VideoTranscript(text=" ".join(points), points=points, segments=cleaned_segments)
+    report = CleanupReport(
+        original_tokens=estimate_tokens(transcript.text),
+        cleaned_tokens=estimate_tokens(cleaned.text),
+        original_segments=len(segments),
+        cleaned_segments=len(cleaned_segments),
+    )
+    return cleaned, report
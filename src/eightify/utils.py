@@ -21,3 +21,10 @@ def extract_video_id(url: str) -> str | None:
     if match:
         return match.group(8)
     return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for English text (~4 characters per token), good enough for budgeting prompts.
+    """
+    return len(text) // 4 + 1
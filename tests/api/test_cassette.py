@@ -0,0 +1,119 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from openai.types.chat import ChatCompletion
+
+from eightify.api import youtube
+from eightify.api.cassette import Cassette, CassetteMiss, CassetteMode, RecordedError, cassette, strip_api_key
+from eightify.api.circuit_breaker import CircuitBreaker
+from eightify.api.llm import base, summarize_text
+from eightify.common import VideoTranscript
+
+
+def test_record_then_replay(tmp_path):
+    calls = []
+
+    def upstream(video_id: str) -> dict:
+        calls.append(video_id)
+        return {"title": f"Video {video_id}"}
+
+    recorder = Cassette(tmp_path, CassetteMode.RECORD)
+    assert recorder.call("youtube", {"id": "abc"}, upstream, "abc") == {"title": "Video abc"}
+
+    player = Cassette(tmp_path, CassetteMode.REPLAY)
+    assert player.call("youtube", {"id": "abc"}, upstream, "abc") == {"title": "Video abc"}
+    assert calls == ["abc"]
+
+    with pytest.raises(CassetteMiss):
+        player.call("youtube", {"id": "other"}, upstream, "other")
+
+
+def test_recorded_errors_are_replayed(tmp_path):
+    def broken():
+        raise ConnectionError("upstream is down")
+
+    with pytest.raises(ConnectionError):
+        Cassette(tmp_path, CassetteMode.RECORD).call("llm", {"prompt": "hi"}, broken)
+
+    with pytest.raises(RecordedError, match="upstream is down"):
+        Cassette(tmp_path, CassetteMode.REPLAY).call("llm", {"prompt": "hi"}, broken)
+
+
+def test_strip_api_key():
+    uri = "https://youtube.googleapis.com/youtube/v3/videos?part=snippet&id=abc&key=SECRET&alt=json"
+    assert strip_api_key(uri) == "https://youtube.googleapis.com/youtube/v3/videos?part=snippet&id=abc&alt=json"
+
+
+def use_cassette(monkeypatch, directory, mode: CassetteMode):
+    monkeypatch.setattr(cassette, "directory", directory)
+    monkeypatch.setattr(cassette, "mode", mode)
+
+
+def test_youtube_calls_replay_offline(tmp_path, monkeypatch):
+    request = youtube.youtube.videos().list(part="snippet", id="abc")
+    response = {"items": [{"snippet": {"title": "Recorded title", "description": "Recorded description"}}]}
+    use_cassette(monkeypatch, tmp_path, CassetteMode.RECORD)
+    monkeypatch.setattr(request, "execute", lambda: response)
+    youtube.execute(request)
+
+    use_cassette(monkeypatch, tmp_path, CassetteMode.REPLAY)
+    details = youtube.get_video_details("abc")
+
+    assert details.title == "Recorded title"
+    with pytest.raises(CassetteMiss):
+        youtube.get_video_details("not recorded")
+
+
+def test_llm_calls_replay_offline(tmp_path, monkeypatch):
+    point = {"emoji": "📼", "title": "Recorded", "content": "Recorded content", "quote": "Recorded quote"}
+    completion = ChatCompletion.model_validate(
+        {
+            "id": "recorded",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "function_call",
+                    "message": {
+                        "role": "assistant",
+                        "function_call": {"name": "summarize", "arguments": json.dumps({"summary": [point]})},
+                    },
+                }
+            ],
+        }
+    )
+    transcript = VideoTranscript(text="A recorded talk", points=["A recorded talk"])
+    use_cassette(monkeypatch, tmp_path, CassetteMode.RECORD)
+    monkeypatch.setattr(base.llm_router, "create", lambda request: completion)
+    recorded = summarize_text(transcript, "Title", "Description")
+
+    def offline(request):
+        raise AssertionError("replay must not call the LLM")
+
+    use_cassette(monkeypatch, tmp_path, CassetteMode.REPLAY)
+    monkeypatch.setattr(base.llm_router, "create", offline)
+
+    assert summarize_text(transcript, "Title", "Description") == recorded
+    assert "Recorded content" in recorded
+
+
+def test_replayed_missing_transcripts_dont_trip_the_breaker(tmp_path, monkeypatch):
+    def no_transcript():
+        raise ValueError("No transcript for this video")
+
+    with pytest.raises(ValueError):
+        Cassette(tmp_path, CassetteMode.RECORD).call(
+            "transcript", {"video_id": "abc", "languages": ["en"]}, no_transcript
+        )
+    use_cassette(monkeypatch, tmp_path, CassetteMode.REPLAY)
+    breaker = CircuitBreaker(
+        "transcript", window=2, min_calls=2, excluded_exceptions=youtube.transcript_breaker.excluded_exceptions
+    )
+    monkeypatch.setattr(youtube, "transcript_breaker", breaker)
+    monkeypatch.setattr(youtube, "YouTubeTranscriptApi", SimpleNamespace(get_transcript=no_transcript))
+
+    assert [youtube.get_video_transcript("abc") for _ in range(3)] == [None] * 3
+    assert not breaker.is_open
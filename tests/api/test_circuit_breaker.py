@@ -0,0 +1,98 @@
+import json
+from types import SimpleNamespace
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from eightify.api.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise ConnectionError("upstream is down")
+
+
+def test_circuit_opens_after_failure_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=0.5, window=4, min_calls=4, recovery_timeout=60)
+
+    assert breaker.call(lambda: "ok") == "ok"
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+
+def test_circuit_closes_after_successful_trial():
+    breaker = CircuitBreaker("test", failure_threshold=0.5, window=2, min_calls=2, recovery_timeout=0)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert not breaker.is_open
+
+
+def test_excluded_exceptions_dont_open_circuit():
+    breaker = CircuitBreaker(
+        "test", failure_threshold=0.5, window=2, min_calls=2, recovery_timeout=60, excluded_exceptions=(KeyError,)
+    )
+
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            breaker.call(lambda: {}["missing"])
+
+    assert not breaker.is_open
+
+
+def test_open_transcript_circuit_is_not_a_missing_transcript(monkeypatch):
+    from eightify.api import youtube
+
+    breaker = CircuitBreaker("transcript", failure_threshold=0.5, window=1, min_calls=1, recovery_timeout=60)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    monkeypatch.setattr(youtube, "transcript_breaker", breaker)
+    monkeypatch.setattr(youtube, "YouTubeTranscriptApi", SimpleNamespace(get_transcript=lambda *args: []))
+
+    with pytest.raises(CircuitOpenError):
+        youtube.get_video_transcript("video")
+
+
+def http_error(status: int, reason: str) -> HttpError:
+    content = json.dumps({"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}})
+    return HttpError(httplib2.Response({"status": status}), content.encode())
+
+
+def refused_request(error: HttpError) -> SimpleNamespace:
+    def execute():
+        raise error
+
+    return SimpleNamespace(method="GET", uri="stub://commentThreads", execute=execute)
+
+
+def test_refused_youtube_requests_dont_open_the_circuit(monkeypatch):
+    from eightify.api import youtube
+
+    breaker = CircuitBreaker(
+        "youtube",
+        failure_threshold=1.0,
+        window=2,
+        min_calls=2,
+        excluded_exceptions=youtube.youtube_breaker.excluded_exceptions,
+    )
+    monkeypatch.setattr(youtube, "youtube_breaker", breaker)
+
+    for _ in range(3):
+        with pytest.raises(youtube.YouTubeRequestError) as raised:
+            youtube.execute(refused_request(http_error(403, "commentsDisabled")))
+        assert raised.value.reason == "commentsDisabled"
+    assert not breaker.is_open
+
+    # An exhausted quota is the upstream failing for everyone
+    for _ in range(2):
+        with pytest.raises(HttpError):
+            youtube.execute(refused_request(http_error(403, "quotaExceeded")))
+    assert breaker.is_open
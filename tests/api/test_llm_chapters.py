@@ -0,0 +1,47 @@
+from eightify.api.llm import chapters
+from eightify.chapters import parse_chapters
+from eightify.common import TranscriptSegment, VideoDetails, VideoTranscript
+
+DESCRIPTION = "00:00 Intro\n01:00 Middle\n02:00 Silence\n03:00 End"
+TRANSCRIPT = VideoTranscript(
+    text="",
+    points=[],
+    segments=[TranscriptSegment(text=f"said at {start}", start=start) for start in (0, 60, 180)],
+)
+
+
+def stub_llm(monkeypatch, fail_on: str | None = None):
+    def summarize_text(transcript, video_title, video_description, priority, max_points, heading):
+        return None if fail_on and fail_on in video_title else f"summary of {transcript.text}"
+
+    def merge_summaries(summaries, title, description, priority):
+        return " + ".join(summaries)
+
+    monkeypatch.setattr(chapters, "summarize_text", summarize_text)
+    monkeypatch.setattr(chapters, "merge_summaries", merge_summaries)
+
+
+def test_chapters_are_summarized_and_merged(monkeypatch):
+    stub_llm(monkeypatch)
+
+    text, chapter_summaries, failed = chapters.summarize_chapters(
+        TRANSCRIPT, VideoDetails(title="Shed", description=DESCRIPTION), parse_chapters(DESCRIPTION)
+    )
+
+    # The chapter without speech has nothing to summarize and isn't a failure
+    assert [summary.chapter.title for summary in chapter_summaries] == ["Intro", "Middle", "End"]
+    assert failed == []
+    assert text.startswith("summary of said at 0 + summary of said at 60 + summary of said at 180")
+    assert "Silence" not in text
+
+
+def test_failed_chapters_are_reported(monkeypatch):
+    stub_llm(monkeypatch, fail_on="Middle")
+
+    text, chapter_summaries, failed = chapters.summarize_chapters(
+        TRANSCRIPT, VideoDetails(title="Shed", description=DESCRIPTION), parse_chapters(DESCRIPTION)
+    )
+
+    assert [summary.chapter.title for summary in chapter_summaries] == ["Intro", "End"]
+    assert [chapter.title for chapter in failed] == ["Middle"]
+    assert "**[01:00] Middle**\n\n_Couldn't summarize this chapter" in text
@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from openai import OpenAI
+
+from eightify.api.circuit_breaker import CircuitOpenError
+from eightify.api.llm.providers import LLMProvider, LLMRouter
+
+REQUEST = {
+    "model": "gpt-4o",
+    "messages": [{"role": "user", "content": "Summarize"}],
+    "functions": [{"name": "summarize", "parameters": {"type": "object", "properties": {}}}],
+    "function_call": {"name": "summarize"},
+}
+
+
+class MockEndpoint:
+    """
+    Local OpenAI-compatible chat completions endpoint with a configurable latency and status code.
+    """
+
+    def __init__(self, name: str, latency: float = 0.0, status: int = 200):
+        self.name = name
+        self.latency = latency
+        self.status = status
+        self.requests: list[dict] = []
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                endpoint.requests.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                time.sleep(endpoint.latency)
+                body = json.dumps(endpoint.completion() if endpoint.status == 200 else {"error": {"message": "down"}})
+                self.send_response(endpoint.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def completion(self) -> dict:
+        function_call = {"name": "summarize", "arguments": json.dumps({"provider": self.name})}
+        return {
+            "id": "mock",
+            "object": "chat.completion",
+            "created": 0,
+            "model": self.requests[-1]["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "function_call",
+                    "message": {"role": "assistant", "content": None, "function_call": function_call},
+                }
+            ],
+        }
+
+    def provider(self, **kwargs) -> LLMProvider:
+        client = OpenAI(base_url=f"http://127.0.0.1:{self.server.server_port}/v1", api_key="unused", max_retries=0)
+        return LLMProvider(self.name, client, **kwargs)
+
+
+@pytest.fixture
+def endpoints():
+    started: list[MockEndpoint] = []
+
+    def start(name: str, **kwargs) -> MockEndpoint:
+        started.append(MockEndpoint(name, **kwargs))
+        return started[-1]
+
+    yield start
+    for endpoint in started:
+        endpoint.server.shutdown()
+
+
+def answered_by(router: LLMRouter) -> str:
+    return json.loads(router.create(REQUEST).choices[0].message.function_call.arguments)["provider"]
+
+
+def test_calls_go_to_the_fastest_provider(endpoints):
+    fast, slow = endpoints("fast"), endpoints("slow", latency=0.2)
+    router = LLMRouter([slow.provider(), fast.provider()], probe_interval=60)
+
+    answers = [answered_by(router) for _ in range(10)]
+
+    # Both get measured once, then everything goes to the fast one
+    assert len(slow.requests) == 1
+    assert answers[2:] == ["fast"] * 8
+
+
+def test_slowed_down_provider_loses_the_traffic(endpoints):
+    first, second = endpoints("first"), endpoints("second", latency=0.05)
+    router = LLMRouter([first.provider(alpha=0.5), second.provider()], probe_interval=60)
+    for _ in range(3):
+        answered_by(router)
+    assert answered_by(router) == "first"
+
+    first.latency = 0.3
+    answers = [answered_by(router) for _ in range(5)]
+
+    assert answers[-1] == "second"
+
+
+def test_failover_to_the_next_provider(endpoints):
+    broken, healthy = endpoints("broken", status=500), endpoints("healthy", latency=0.05)
+    router = LLMRouter([broken.provider(), healthy.provider()], probe_interval=60)
+
+    assert [answered_by(router) for _ in range(3)] == ["healthy"] * 3
+
+    # The errors push the broken provider behind the healthy one even though it answers faster
+    assert len(broken.requests) <= 2
+    assert router.stats()["broken"]["error_rate"] > 0.5
+
+
+def test_recovered_provider_is_probed(endpoints):
+    flaky, healthy = endpoints("flaky", status=500), endpoints("healthy", latency=0.05)
+    router = LLMRouter([flaky.provider(), healthy.provider()], probe_interval=0.2)
+    for _ in range(3):
+        answered_by(router)
+    assert router.stats()["flaky"]["error_rate"] > 0.5
+
+    flaky.status = 200
+    assert answered_by(router) == "healthy"
+
+    # Once the probe interval is over, the unhealthy provider gets a call again and wins the traffic back
+    time.sleep(0.3)
+    answers = [answered_by(router) for _ in range(3)]
+
+    assert answers[0] == "flaky"
+    assert router.stats()["flaky"]["error_rate"] < 0.5
+
+
+def test_all_providers_failing_raises(endpoints):
+    router = LLMRouter([endpoints("a", status=500).provider(), endpoints("b", status=503).provider()])
+
+    with pytest.raises(Exception):
+        router.create(REQUEST)
+
+
+def test_providers_that_cant_take_the_prompt_are_skipped(endpoints):
+    no_functions = endpoints("no_functions")
+    small = endpoints("small")
+    large = endpoints("large", latency=0.05)
+    router = LLMRouter(
+        [
+            no_functions.provider(function_calling=False),
+            small.provider(max_context_tokens=4096),
+            large.provider(),
+        ]
+    )
+
+    assert answered_by(router) == "large"
+    assert no_functions.requests == small.requests == []
+
+    with pytest.raises(CircuitOpenError):
+        LLMRouter([no_functions.provider(function_calling=False)]).create(REQUEST)
+
+
+def test_model_override(endpoints):
+    local = endpoints("local")
+    router = LLMRouter([local.provider(model="llama3.1")])
+
+    answered_by(router)
+
+    assert local.requests[0]["model"] == "llama3.1"
@@ -0,0 +1,75 @@
+import pytest
+
+from eightify.api.llm import rollup
+
+
+def titles(count: int) -> list[str]:
+    return [f"Video {i}" for i in range(count)]
+
+
+def fake_merge(calls: list[list[str]], fail_on: str | None = None, descriptions: list[str] | None = None):
+    def merge(summaries, title, description, priority, heading):
+        calls.append(list(summaries))
+        if descriptions is not None:
+            descriptions.append(description)
+        if fail_on in summaries:
+            return None
+        return f"{heading or ''}({'+'.join(summaries)})"
+
+    return merge
+
+
+def test_rollup_merges_in_a_tree(monkeypatch):
+    calls: list[list[str]] = []
+    monkeypatch.setattr(rollup, "merge_summaries", fake_merge(calls))
+
+    result, merged = rollup.rollup_summaries([str(i) for i in range(10)], "Channel", titles(10), fanout=4)
+
+    # 10 -> 3 groups (the last is merged too) -> 1 final merge with the heading
+    assert result == "Key Points((0+1+2+3)+(4+5+6+7)+(8+9))"
+    assert merged == list(range(10))
+    assert len(calls) == 4
+    assert max(len(group) for group in calls) <= 4
+
+
+def test_merges_only_list_the_videos_they_cover(monkeypatch):
+    descriptions: list[str] = []
+    monkeypatch.setattr(rollup, "merge_summaries", fake_merge([], descriptions=descriptions))
+
+    rollup.rollup_summaries([str(i) for i in range(8)], "Channel", titles(8), fanout=4)
+
+    leaves, root = sorted(descriptions[:2]), descriptions[2]
+    assert leaves == ["Videos:\n" + "\n".join(f"- Video {i}" for i in range(start, start + 4)) for start in (0, 4)]
+    assert root == "Videos:\n" + "\n".join(f"- Video {i}" for i in range(8))
+
+
+def test_rollup_single_summary_is_returned_as_is(monkeypatch):
+    calls: list[list[str]] = []
+    monkeypatch.setattr(rollup, "merge_summaries", fake_merge(calls))
+
+    assert rollup.rollup_summaries(["only"], "Channel", titles(1)) == ("only", [0])
+    assert calls == []
+
+
+def test_rollup_drops_failed_groups(monkeypatch):
+    calls: list[list[str]] = []
+    monkeypatch.setattr(rollup, "merge_summaries", fake_merge(calls, fail_on="0"))
+
+    result, merged = rollup.rollup_summaries([str(i) for i in range(6)], "Channel", titles(6), fanout=2)
+
+    assert result is not None
+    assert "0" not in result and "5" in result
+    # The summary of 1 was merged with the one of 0 and is lost with it
+    assert merged == [2, 3, 4, 5]
+
+
+def test_rollup_all_merges_failing(monkeypatch):
+    monkeypatch.setattr(rollup, "merge_summaries", fake_merge([], fail_on="0"))
+
+    assert rollup.rollup_summaries(["0", "1"], "Channel", titles(2)) == (None, [])
+
+
+@pytest.mark.parametrize("fanout", [0, 1])
+def test_rollup_rejects_fanout_below_two(fanout):
+    with pytest.raises(ValueError):
+        rollup.rollup_summaries(["a", "b"], "Channel", titles(2), fanout=fanout)
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from eightify.api.llm.scheduler import LLMScheduler, Priority, SchedulerTimeout
+
+WEIGHTS = {"interactive": 6, "comments": 3, "rollup": 2, "background": 1}
+
+
+def test_interactive_calls_overtake_queued_bulk_work():
+    scheduler = LLMScheduler(max_concurrency=1, weights=WEIGHTS, class_concurrency={})
+    order = []
+
+    def call(priority: Priority):
+        with scheduler.slot(priority):
+            order.append(priority)
+            time.sleep(0.01)
+
+    with scheduler.slot(Priority.BACKGROUND):
+        threads = [threading.Thread(target=call, args=(Priority.BACKGROUND,)) for _ in range(3)]
+        threads += [threading.Thread(target=call, args=(Priority.INTERACTIVE,)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.01)
+        assert scheduler.stats()["classes"]["background"]["queue_depth"] == 3
+
+    for thread in threads:
+        thread.join()
+
+    assert order[:3] == [Priority.INTERACTIVE] * 3
+
+
+def test_class_concurrency_cap_and_timeout():
+    scheduler = LLMScheduler(max_concurrency=4, weights=WEIGHTS, class_concurrency={"background": 1})
+
+    with scheduler.slot(Priority.BACKGROUND):
+        with pytest.raises(SchedulerTimeout):
+            with scheduler.slot(Priority.BACKGROUND, timeout=0.05):
+                pass
+        # Other classes still get the spare capacity
+        with scheduler.slot(Priority.INTERACTIVE, timeout=0.05):
+            pass
+
+    stats = scheduler.stats()["classes"]["background"]
+    assert stats["timed_out"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_completion_estimate_grows_with_the_calls_of_the_work():
+    scheduler = LLMScheduler(max_concurrency=4, weights=WEIGHTS, class_concurrency={})
+    with scheduler.slot(Priority.INTERACTIVE):
+        time.sleep(0.05)
+
+    single = scheduler.estimate_completion(Priority.INTERACTIVE)
+    assert scheduler.estimate_completion(Priority.INTERACTIVE, calls=2, depth=2) == pytest.approx(2 * single)
+    # 9 parallel calls over 4 slots, then the merge
+    chapters = scheduler.estimate_completion(Priority.INTERACTIVE, calls=10, depth=2)
+    assert chapters == pytest.approx((8 / 4 + 2) * single)
+
+
+def test_classes_missing_from_the_settings_get_defaults():
+    scheduler = LLMScheduler(max_concurrency=4, weights={"interactive": 6}, class_concurrency={})
+
+    classes = scheduler.stats()["classes"]
+    assert classes["rollup"]["weight"] == 1
+    assert classes["rollup"]["max_concurrency"] == 4
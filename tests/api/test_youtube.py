@@ -1,8 +1,13 @@
-from eightify.api.youtube import get_video_comments, get_video_details, get_video_transcript
+from itertools import islice
+
+import pytest
+
+from eightify.api.youtube import get_video_details, get_video_transcript, iter_video_comments
 
 TEST_VIDEO_ID = "dQw4w9WgXcQ"
 
 
+@pytest.mark.integration
 def test_integration_get_video_details():
     result = get_video_details(TEST_VIDEO_ID)
     assert result
@@ -10,6 +15,7 @@ def test_integration_get_video_details():
     assert "Never Gonna Give You Up" in result.description
 
 
+@pytest.mark.integration
 def test_integration_get_video_transcript():
     result = get_video_transcript(TEST_VIDEO_ID)
     assert result
@@ -17,9 +23,10 @@ def test_integration_get_video_transcript():
     assert "never going to sing goodbye" in result.text
 
 
-def test_integration_get_video_comments():
-    result = get_video_comments(TEST_VIDEO_ID)
-    assert result
-    assert isinstance(result, list)
-    assert len(result) > 0  # Ensure we got at least one comment
-    assert isinstance(result[0].text, str)  # Check that comments are strings
+@pytest.mark.integration
+def test_integration_iter_video_comments():
+    result = list(islice(iter_video_comments(TEST_VIDEO_ID, max_threads=150), 300))
+    assert len(result) > 100  # More than one page of threads
+    assert all(isinstance(comment.text, str) for comment in result)
+    assert any(comment.like_count > 0 for comment in result)
+    assert any(comment.published_at is not None for comment in result)
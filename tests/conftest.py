@@ -0,0 +1,21 @@
+from pathlib import Path
+
+import pytest
+
+from eightify.api.cassette import CassetteMode, cassette
+from eightify.config import config
+
+
+@pytest.fixture(autouse=True)
+def integration_cassette(request, monkeypatch):
+    """
+    Every integration test records to and replays from its own directory of cassettes.
+    With CASSETTE_MODE=replay they run offline; the ones that haven't been recorded yet are skipped.
+    """
+    if request.node.get_closest_marker("integration") is None or cassette.mode == CassetteMode.OFF:
+        return
+
+    directory = Path(config.cassette_dir) / request.module.__name__.split(".")[-1] / request.node.name
+    if cassette.mode == CassetteMode.REPLAY and not directory.exists():
+        pytest.skip(f"No recording in {directory}, record it with CASSETTE_MODE=record")
+    monkeypatch.setattr(cassette, "directory", directory)
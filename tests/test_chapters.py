@@ -0,0 +1,36 @@
+from eightify.chapters import format_timestamp, parse_chapters, slice_transcript
+from eightify.common import TranscriptSegment, VideoTranscript
+
+DESCRIPTION = """In this video we build a shed.
+
+00:00 Intro
+[04:12] - Foundation
+Roof (12:30)
+1:02:03 | Q&A
+
+Follow me on 10:30 socials!"""
+
+
+def test_parse_chapters():
+    chapters = parse_chapters(DESCRIPTION)
+
+    assert [chapter.title for chapter in chapters] == ["Intro", "Foundation", "Roof", "Q&A"]
+    assert [chapter.start for chapter in chapters] == [0, 252, 750, 3723]
+    assert chapters[0].end == 252
+    assert chapters[-1].end is None
+    assert format_timestamp(chapters[-1].start) == "1:02:03"
+
+
+def test_no_chapters_without_zero_start():
+    assert parse_chapters("01:00 Intro\n02:00 Middle\n03:00 End") == []
+    assert parse_chapters("Just a description") == []
+
+
+def test_slice_transcript():
+    chapters = parse_chapters(DESCRIPTION)
+    segments = [TranscriptSegment(text=f"s{start}", start=start) for start in (0, 100, 252, 800, 4000)]
+    transcript = VideoTranscript(text="", points=[], segments=segments)
+
+    slices = slice_transcript(transcript, chapters)
+
+    assert [chapter_slice.text for chapter_slice in slices] == ["s0 s100", "s252", "s800", "s4000"]
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from eightify.common import TranscriptSegment, VideoComment, VideoDetails, VideoTranscript
+from eightify.corpus import (
+    CorpusStore,
+    iter_comments,
+    load_transcript,
+    load_video_details,
+    record_comments,
+    save_transcript,
+    save_video_details,
+)
+
+
+def test_records_survive_reopening_and_compaction(tmp_path):
+    store = CorpusStore(tmp_path, max_segment_size=10)
+    store.put_many({"a": b"first" * 50, "b": b"second"})
+    store.put("a", b"updated")
+    store.put("c", b"third")
+    store.close()
+
+    store = CorpusStore(tmp_path, max_segment_size=10)
+    assert store.get("a") == b"updated"
+    assert store.get("missing") is None
+    assert store.stats()["segments"] == 3
+
+    store.compact()
+    assert {key: store.get(key) for key in store.keys()} == {"a": b"updated", "b": b"second", "c": b"third"}
+    assert store.stats()["size"] == store.stats()["live_size"]
+
+    reopened = CorpusStore(tmp_path)
+    assert reopened.get("c") == b"third"
+
+
+def test_video_data_round_trip(tmp_path):
+    store = CorpusStore(tmp_path)
+    details = VideoDetails(title="Title", description="Description")
+    save_video_details(store, "video", details)
+    assert load_video_details(store, "video") == details
+
+    transcript = VideoTranscript(text="hi", points=["hi"], segments=[TranscriptSegment(text="hi", start=1.5)])
+    save_transcript(store, "video", transcript)
+    assert load_transcript(store, "video") == transcript
+
+    comments = [VideoComment(text=f"comment {i}", like_count=i) for i in range(5)]
+    assert iter_comments(store, "video") is None
+    assert list(record_comments(store, "video", comments, batch_size=2)) == comments
+    assert list(iter_comments(store, "video")) == comments
+
+
+@pytest.mark.parametrize("crash_at", ["index", "cleanup"])
+def test_interrupted_compaction_loses_nothing(tmp_path, monkeypatch, crash_at):
+    store = CorpusStore(tmp_path, max_segment_size=10)
+    records = {f"key{i}": f"value {i}".encode() * 20 for i in range(20)}
+    store.put_many(records)
+    store.put("key0", b"updated")
+    records["key0"] = b"updated"
+
+    if crash_at == "index":
+        # Dies after copying the records, before the new index replaces the old one
+        def crash(*args):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(os, "replace", crash)
+        with pytest.raises(KeyboardInterrupt):
+            store.compact()
+        monkeypatch.undo()
+    else:
+        # Dies after the new index is in place, before the old segments are deleted
+        old_segments = {path: path.read_bytes() for path in tmp_path.glob("*.seg")}
+        store.compact()
+        for path, data in old_segments.items():
+            path.write_bytes(data)
+
+    reopened = CorpusStore(tmp_path, max_segment_size=10)
+    assert {key: reopened.get(key) for key in reopened.keys()} == records
+    # Whatever the compaction left behind is gone
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.endswith(".seg")) == ["index.jsonl"]
+    if crash_at == "cleanup":
+        assert reopened.stats()["size"] == reopened.stats()["live_size"]
@@ -0,0 +1,36 @@
+import random
+
+from eightify.fingerprint import FingerprintIndex, fingerprint
+
+random.seed(0)
+VOCABULARY = [f"word{i}" for i in range(500)]
+TEXT = " ".join(random.choice(VOCABULARY) for _ in range(1000))
+
+
+def test_exact_duplicates_ignore_case_and_punctuation():
+    index = FingerprintIndex(min_words=5)
+    index.add(fingerprint("Hello, world! This is a talk."), "original")
+
+    assert index.find(fingerprint("hello world   this is a talk")) == ["original"]
+    assert index.find(fingerprint("a completely different talk here")) == []
+
+
+def test_short_texts_are_never_duplicates():
+    index = FingerprintIndex(min_words=200)
+    index.add(fingerprint(""), "music only")
+    index.add(fingerprint("Thanks for watching"), "outro")
+
+    assert index.find(fingerprint("")) == []
+    assert index.find(fingerprint("thanks for watching!")) == []
+
+
+def test_near_duplicates_are_found():
+    index = FingerprintIndex(max_distance=3, min_words=200)
+    index.add(fingerprint(TEXT), "original")
+
+    words = TEXT.split(" ")
+    words[500] = "changed"
+    clip = " ".join(words)
+
+    assert index.find(fingerprint(clip)) == ["original"]
+    assert index.find(fingerprint(" ".join(random.choice(VOCABULARY) for _ in range(1000)))) == []
@@ -0,0 +1,55 @@
+from eightify.insight import canonical_insight_request, find_similar_request, insight_similarity
+
+
+def test_rewordings_share_a_key():
+    keys = {
+        canonical_insight_request(request)
+        for request in [
+            "what do viewers think about the diet?",
+            "What do viewers think of the diet",
+            "  what do PEOPLE say about diets  ",
+        ]
+    }
+    assert keys == {"diet"}
+
+
+def test_word_order_does_not_matter():
+    assert canonical_insight_request("sleep and diet") == canonical_insight_request("diet, sleep")
+
+
+def test_empty_requests_are_no_request():
+    assert canonical_insight_request(None) is None
+    assert canonical_insight_request("") is None
+    assert canonical_insight_request("What do viewers think?") is None
+
+
+def test_similar_requests_are_matched():
+    known = ["diet sleep", "music"]
+
+    assert insight_similarity("diet sleep", "diet sleep") == 1.0
+    assert find_similar_request("diet sleep", known) == "diet sleep"
+    assert find_similar_request("diet exercise sleep", known, threshold=0.6) == "diet sleep"
+    assert find_similar_request("diet exercise sleep", known, threshold=0.75) is None
+    assert find_similar_request("cooking", known) is None
+
+
+def test_negations_and_comparatives_are_kept():
+    assert canonical_insight_request("who did not like the diet") == "diet like not"
+    assert canonical_insight_request("who liked the diet most") != canonical_insight_request("who liked the diet")
+    assert find_similar_request(canonical_insight_request("who did NOT like it"), ["like"]) is None
+
+
+def test_directions_and_non_plurals_dont_collide():
+    requests = [
+        "what do viewers think about people over 50",
+        "what do viewers think about people under 50",
+        "opinions after the update",
+        "opinions before the update",
+        "opinions about the update",
+        "what do people think about the news",
+        "what do people think about the new",
+    ]
+    keys = [canonical_insight_request(request) for request in requests]
+
+    assert len(set(keys)) == len(requests), keys
+    assert canonical_insight_request("analysis of the diets") == "analysis diet"
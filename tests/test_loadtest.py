@@ -0,0 +1,53 @@
+import socket
+
+from eightify import rate_limit
+from eightify.api import youtube
+from eightify.api.llm.providers import llm_router
+from eightify.config import config
+from eightify.loadtest import LevelReport, Workload, find_saturation, run_closed_loop, start_stub_app, summarize_level
+from eightify.rate_limit import RateLimiter
+
+
+def make_report(level: float, throughput: float, p95: float, error_rate: float = 0.0) -> LevelReport:
+    return LevelReport(
+        level=level, requests=100, throughput=throughput, p50=p95 / 2, p95=p95, p99=p95, error_rate=error_rate
+    )
+
+
+def test_find_saturation():
+    reports = [make_report(1, 1.0, 1.0), make_report(2, 2.0, 1.5), make_report(4, 3.5, 12.0)]
+    assert find_saturation(reports, slo_p95=10, max_error_rate=0.01).level == 4
+
+    plateau = [make_report(1, 1.0, 1.0), make_report(2, 1.02, 2.0)]
+    assert find_saturation(plateau, slo_p95=10, max_error_rate=0.01).level == 2
+
+    assert find_saturation(reports[:2], slo_p95=10, max_error_rate=0.01) is None
+
+
+def test_workload_popularity_is_skewed():
+    workload = Workload(videos=100, zipf_s=1.1, comments_ratio=0.0, seed=0)
+    requested = [workload.next_request()[1]["video_id"] for _ in range(2000)]
+
+    assert requested.count("video00000") > requested.count("video00050") * 10
+
+
+def test_closed_loop_against_the_stub_app(monkeypatch):
+    # start_stub_app swaps the upstreams in place; recording the originals restores them afterwards
+    monkeypatch.setattr(youtube, "youtube", youtube.youtube)
+    monkeypatch.setattr(youtube, "YouTubeTranscriptApi", youtube.YouTubeTranscriptApi)
+    monkeypatch.setattr(llm_router, "providers", llm_router.providers)
+    # The settings are already loaded, so the env start_stub_app sets up comes too late for them
+    monkeypatch.setattr(config, "use_corpus", False)
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(per_minute=1_000_000, burst=1000))
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    url = start_stub_app(port, llm_latency=0.01, youtube_latency=0.001)
+    workload = Workload(videos=5, zipf_s=1.1, comments_ratio=0.3, seed=0)
+    results = run_closed_loop(url, workload, users=2, duration=1.0, think_time=0.0, timeout=10)
+    report = summarize_level(2, results, duration=1.0)
+
+    assert report.requests > 2
+    assert report.error_rate == 0.0, report.status_counts
+    assert {result.endpoint for result in results} == {"summarize", "analyze_comments"}
@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from eightify import main, rate_limit
+from eightify.api.llm import chapters, rollup
+from eightify.api.llm.scheduler import Priority, llm_scheduler
+from eightify.common import CommentAnalysis, TranscriptSegment, VideoDetails, VideoTranscript
+from eightify.config import config
+from eightify.rate_limit import RateLimiter
+
+LLM_LATENCY = 0.3
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """
+    The app with stub YouTube and LLM: every video has its own transcript, every summary takes LLM_LATENCY.
+    """
+    monkeypatch.setattr(config, "use_corpus", False)
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(per_minute=1000, burst=1000))
+    monkeypatch.setattr(
+        main.youtube, "get_video_details", lambda video_id: VideoDetails(title=video_id, description="")
+    )
+    monkeypatch.setattr(
+        main,
+        "get_clean_video_transcript",
+        lambda video_id, corpus=None: VideoTranscript(text=f"transcript of {video_id}", points=[]),
+    )
+
+    def summarize_text(transcript, video_title, video_description, priority, model=None):
+        time.sleep(LLM_LATENCY)
+        return f"summary of {video_title} by {model or config.llm_model}"
+
+    monkeypatch.setattr(main.llm, "summarize_text", summarize_text)
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_interactive_requests_overlap(client):
+    responses = {}
+
+    def summarize(video_id: str):
+        responses[video_id] = client.post("/summarize", json={"video_id": video_id})
+
+    started_at = time.perf_counter()
+    threads = [threading.Thread(target=summarize, args=(video_id,)) for video_id in ["a", "b"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.perf_counter() - started_at < 2 * LLM_LATENCY
+    assert [responses[video_id].status_code for video_id in ["a", "b"]] == [200, 200]
+
+
+def test_summaries_are_not_queued_behind_comment_analyses(client, monkeypatch):
+    def generate_comment_analysis(video_id, app_state, video_details, insight_request):
+        with llm_scheduler.slot(Priority.COMMENTS):
+            time.sleep(LLM_LATENCY)
+        return CommentAnalysis(comments=[], overall_analysis=video_id, topics=[])
+
+    monkeypatch.setattr(main, "generate_comment_analysis", generate_comment_analysis)
+    # More analyses than the default executor has threads on a small machine
+    threads = [
+        threading.Thread(target=client.post, args=("/analyze_comments",), kwargs={"json": {"video_id": str(i)}})
+        for i in range(12)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(LLM_LATENCY / 5)
+
+    # The comments class is capped below the total, so there's an LLM slot for the summary right away
+    started_at = time.perf_counter()
+    assert client.post("/summarize", json={"video_id": "video"}).status_code == 200
+    assert time.perf_counter() - started_at < 1.5 * LLM_LATENCY
+    for thread in threads:
+        thread.join()
+
+
+def test_cached_summary_is_served_while_generating(client):
+    client.post("/summarize", json={"video_id": "cached"})
+    thread = threading.Thread(target=client.post, args=("/summarize",), kwargs={"json": {"video_id": "new"}})
+    thread.start()
+    time.sleep(LLM_LATENCY / 5)
+
+    started_at = time.perf_counter()
+    assert client.post("/summarize", json={"video_id": "cached"}).status_code == 200
+    assert time.perf_counter() - started_at < LLM_LATENCY / 2
+    thread.join()
+
+
+def test_progressive_summary_is_refined(client):
+    draft = client.post("/summarize", json={"video_id": "video", "progressive": True}).json()
+    assert draft["draft"] and config.draft_llm_model in draft["summary"]
+
+    # The refinement runs as a background task of the first request
+    refined = client.get("/summary/video").json()
+    assert not refined["draft"] and config.llm_model in refined["summary"]
+
+
+def test_failed_refinement_is_reported_and_retried(client, monkeypatch):
+    summarize_text = main.llm.summarize_text
+
+    def failing_refinement(transcript, video_title, video_description, priority, model=None):
+        return summarize_text(transcript, video_title, video_description, priority, model) if model else None
+
+    monkeypatch.setattr(main.llm, "summarize_text", failing_refinement)
+    client.post("/summarize", json={"video_id": "video", "progressive": True})
+
+    failed = client.get("/summary/video").json()
+    assert failed["draft"] and failed["refine_failed"]
+
+    monkeypatch.setattr(main.llm, "summarize_text", summarize_text)
+    client.post("/summarize", json={"video_id": "video", "progressive": True})
+    assert not client.get("/summary/video").json()["draft"]
+
+
+def test_rollup_reports_videos_lost_in_a_failed_merge(client, monkeypatch):
+    def merge_summaries(summaries, title, description, priority, heading):
+        if any("summary of e " in summary for summary in summaries):
+            return None
+        return " + ".join(summaries)
+
+    monkeypatch.setattr(rollup, "merge_summaries", merge_summaries)
+
+    # Merged in groups of 4: a-d make it, e and f go down with the failed merge
+    response = client.post("/rollup", json={"video_ids": list("abcdef")}).json()
+
+    assert response["video_ids"] == list("abcd")
+    assert response["skipped_video_ids"] == ["e", "f"]
+
+
+def test_chapter_summary_with_a_failed_chapter_is_retried(client, monkeypatch):
+    description = "00:00 Intro\n01:00 Middle\n02:00 End"
+    monkeypatch.setattr(
+        main.youtube, "get_video_details", lambda video_id: VideoDetails(title=video_id, description=description)
+    )
+    segments = [TranscriptSegment(text=f"said at {start}", start=start) for start in (0, 60, 120)]
+    monkeypatch.setattr(
+        main,
+        "get_clean_video_transcript",
+        lambda video_id, corpus=None: VideoTranscript(text="", points=[], segments=segments),
+    )
+    failing = {"Middle"}
+    monkeypatch.setattr(
+        chapters,
+        "summarize_text",
+        lambda transcript, video_title, *args, **kwargs: None
+        if any(title in video_title for title in failing)
+        else f"summary of {transcript.text}",
+    )
+    monkeypatch.setattr(chapters, "merge_summaries", lambda summaries, *args, **kwargs: " + ".join(summaries))
+
+    partial = client.post("/summarize", json={"video_id": "video", "chapters": True}).json()
+    assert [chapter["title"] for chapter in partial["skipped_chapters"]] == ["Middle"]
+    assert len(partial["chapters"]) == 2
+
+    # Not cached as complete: the next request gets it as stale and fills the gap in the background
+    failing.clear()
+    stale = client.post("/summarize", json={"video_id": "video", "chapters": True}).json()
+    assert stale["stale"] and stale["skipped_chapters"]
+
+    complete = client.post("/summarize", json={"video_id": "video", "chapters": True}).json()
+    assert not complete["stale"] and complete["skipped_chapters"] == []
+    assert len(complete["chapters"]) == 3
+
+
+def test_comments_disabled_is_no_content(client, monkeypatch):
+    def iter_video_comments(video_id):
+        raise main.youtube.YouTubeRequestError(403, "commentsDisabled", "The video has disabled comments.")
+        yield
+
+    monkeypatch.setattr(main.youtube, "iter_video_comments", iter_video_comments)
+
+    assert client.post("/analyze_comments", json={"video_id": "video"}).status_code == 204
+
+
+def test_rollup_of_an_unknown_playlist_is_not_found(client, monkeypatch):
+    def get_playlist_video_ids(playlist_id, max_videos, published_after):
+        raise main.youtube.YouTubeRequestError(404, "playlistNotFound", "The playlist could not be found.")
+
+    monkeypatch.setattr(main.youtube, "get_playlist_video_ids", get_playlist_video_ids)
+
+    response = client.post("/rollup", json={"playlist_id": "PLunknown"})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Playlist not found"
+
+
+def test_duplicate_summary_keeps_the_age_of_the_original(client, monkeypatch):
+    text = " ".join(f"word{i}" for i in range(300))
+    monkeypatch.setattr(
+        main, "get_clean_video_transcript", lambda video_id, corpus=None: VideoTranscript(text=text, points=[])
+    )
+    fingerprint, on_loop = main.fingerprint, []
+
+    def recording_fingerprint(text):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return fingerprint(text)
+
+    monkeypatch.setattr(main, "fingerprint", recording_fingerprint)
+    video_summaries = main.app.state.video_summaries
+
+    original = client.post("/summarize", json={"video_id": "original"}).json()
+    assert client.post("/summarize", json={"video_id": "mirror"}).json()["summary"] == original["summary"]
+    assert video_summaries.get("mirror").created_at == video_summaries.get("original").created_at
+    # Fingerprinting a long transcript would block every other request
+    assert on_loop == [False, False]
+
+    # A copy of a stale summary is stale too, and gets revalidated
+    video_summaries.get("original").created_at -= config.summary_cache_ttl + 1
+    reused = client.post("/summarize", json={"video_id": "copy"}).json()
+    assert reused["stale"] and reused["summary"] == original["summary"]
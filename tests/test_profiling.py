@@ -0,0 +1,52 @@
+import pstats
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from eightify import profiling
+from eightify.config import config
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "profile_dir", str(tmp_path))
+    app = FastAPI()
+    app.middleware("http")(profiling.profile_request)
+
+    @app.get("/work")
+    async def work():
+        return sum(i * i for i in range(10_000))
+
+    return TestClient(app)
+
+
+def test_header_is_ignored_unless_allowed(client, monkeypatch):
+    response = client.get("/work", headers={profiling.PROFILE_HEADER: "1"})
+    assert profiling.PROFILE_ID_HEADER not in response.headers
+
+    monkeypatch.setattr(config, "profile_allow_header", True)
+    response = client.get("/work", headers={profiling.PROFILE_HEADER: "1"})
+    assert profiling.PROFILE_ID_HEADER in response.headers
+
+
+def test_sampled_requests_are_saved_and_formatted(client, monkeypatch):
+    monkeypatch.setattr(config, "profile_sample_rate", 1.0)
+    profile_id = client.get("/work").headers[profiling.PROFILE_ID_HEADER]
+
+    assert [profile["id"] for profile in profiling.list_profiles()] == [profile_id]
+    path = profiling.get_profile_path(profile_id)
+    assert "function calls" in profiling.format_profile(path, sort_by=pstats.SortKey.TIME, limit=5)
+
+
+def test_profiles_are_capped(client, monkeypatch):
+    monkeypatch.setattr(config, "profile_sample_rate", 1.0)
+    monkeypatch.setattr(config, "profile_max_files", 2)
+    for _ in range(4):
+        client.get("/work")
+
+    assert len(profiling.list_profiles()) == 2
+
+
+def test_profile_ids_cant_escape_the_directory():
+    assert profiling.get_profile_path("../config") is None
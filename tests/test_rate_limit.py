@@ -0,0 +1,63 @@
+from starlette.requests import Request
+
+from eightify.config import config
+from eightify.rate_limit import RateLimiter, get_client_id
+
+
+def test_rate_limiter_allows_burst_then_limits():
+    limiter = RateLimiter(per_minute=60, burst=3)
+
+    assert [limiter.acquire("alice") for _ in range(3)] == [0, 0, 0]
+    retry_after = limiter.acquire("alice")
+    assert 0 < retry_after <= 1
+    # Other clients have their own buckets
+    assert limiter.acquire("bob") == 0
+
+
+def test_rate_limiter_forgets_least_recent_clients():
+    limiter = RateLimiter(per_minute=60, burst=1, max_clients=2)
+
+    limiter.acquire("alice")
+    limiter.acquire("bob")
+    limiter.acquire("carol")
+
+    assert limiter.acquire("alice") == 0
+    assert limiter.acquire("carol") > 0
+
+
+def make_request(peer: str, forwarded_for: str | None = None, client_id: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    if client_id:
+        headers.append((b"x-client-id", client_id.encode()))
+    return Request({"type": "http", "headers": headers, "client": (peer, 12345)})
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers(monkeypatch):
+    monkeypatch.setattr(config, "trusted_proxies", [])
+
+    assert get_client_id(make_request("203.0.113.7", "1.1.1.1")) == "203.0.113.7"
+    assert get_client_id(make_request("203.0.113.7", "2.2.2.2")) == "203.0.113.7"
+
+
+def test_forwarded_for_from_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(config, "trusted_proxies", ["10.0.0.1", "10.0.0.2"])
+
+    assert get_client_id(make_request("10.0.0.1", "198.51.100.4")) == "198.51.100.4"
+    # A spoofed first hop doesn't matter, the address our proxies saw does
+    assert get_client_id(make_request("10.0.0.2", "1.1.1.1, 198.51.100.4, 10.0.0.1")) == "198.51.100.4"
+    assert get_client_id(make_request("10.0.0.1")) == "10.0.0.1"
+
+
+def test_client_id_header_from_the_local_frontend(monkeypatch):
+    monkeypatch.setattr(config, "trusted_proxies", [])
+
+    assert get_client_id(make_request("127.0.0.1", client_id="session1")) == "session:session1"
+    assert get_client_id(make_request("203.0.113.7", client_id="session1")) == "203.0.113.7"
+
+
+def test_client_id_header_is_ignored_behind_a_local_proxy(monkeypatch):
+    monkeypatch.setattr(config, "trusted_proxies", ["127.0.0.1"])
+
+    # Anyone reaching the proxy could rotate the id to get a new bucket on every request
+    assert get_client_id(make_request("127.0.0.1", "198.51.100.4", client_id="a")) == "198.51.100.4"
+    assert get_client_id(make_request("127.0.0.1", "198.51.100.4", client_id="b")) == "198.51.100.4"
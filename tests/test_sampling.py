@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from eightify.common import VideoComment
+from eightify.sampling import sample_comments
+
+NOW = datetime(2024, 7, 1, tzinfo=timezone.utc)
+
+
+def make_comments(count: int) -> list[VideoComment]:
+    return [
+        VideoComment(
+            text=f"Comment number {i} with some words in it",
+            like_count=1000 if i % 97 == 0 else i % 5,
+            published_at=NOW - timedelta(days=i % 400),
+            is_reply=i % 11 == 0,
+        )
+        for i in range(count)
+    ]
+
+
+def test_sample_is_deterministic_and_order_independent():
+    comments = make_comments(2000)
+
+    sample = sample_comments(comments, token_budget=500, seed="video", now=NOW)
+    reversed_sample = sample_comments(reversed(comments), token_budget=500, seed="video", now=NOW)
+    other_seed_sample = sample_comments(comments, token_budget=500, seed="other", now=NOW)
+
+    assert sample == reversed_sample
+    assert sample != other_seed_sample
+
+
+def test_sample_respects_budget_and_keeps_rare_strata():
+    comments = make_comments(5000)
+
+    sample = sample_comments(comments, token_budget=1000, max_comments=100, seed="video", now=NOW, reservoir_size=20)
+
+    assert 0 < len(sample) <= 100
+    assert sum(len(comment.text) // 4 + 1 for comment in sample) <= 1000
+    assert any(comment.like_count >= 100 for comment in sample)
+    assert any(comment.is_reply for comment in sample)
+
+
+def test_count_cap_is_shared_between_strata():
+    comments = make_comments(5000)
+
+    # Plenty of budget, so the count cap is what binds
+    sample = sample_comments(comments, token_budget=100_000, max_comments=30, seed="video", now=NOW)
+
+    assert len(sample) == 30
+    assert any(comment.is_reply for comment in sample)
+    assert any(NOW - comment.published_at >= timedelta(days=365) for comment in sample)
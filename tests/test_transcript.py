@@ -0,0 +1,36 @@
+from eightify.common import TranscriptSegment, VideoTranscript
+from eightify.transcript import clean_text, clean_transcript
+
+
+def test_clean_text():
+    assert clean_text("[Music] so um the the idea is   uh simple ♪") == "so the idea is simple"
+    assert clean_text("(audience laughter) right") == "right"
+
+
+def test_clean_transcript_dedups_overlapping_windows_and_keeps_timestamps():
+    texts = ["[Applause]", "welcome back to the channel", "to the channel today we talk", "today we talk about sheds"]
+    segments = [TranscriptSegment(text=text, start=float(i * 2), duration=3.0) for i, text in enumerate(texts)]
+    transcript = VideoTranscript(text=" ".join(texts), points=texts, segments=segments)
+
+    cleaned, report = clean_transcript(transcript)
+
+    assert cleaned.text == "welcome back to the channel today we talk about sheds"
+    assert [segment.start for segment in cleaned.segments] == [2.0, 4.0, 6.0]
+    assert report.cleaned_segments == 3
+    assert report.cleaned_tokens < report.original_tokens
+    assert 0 < report.reduction < 1
+
+
+def test_meaningful_repeats_are_kept():
+    assert clean_text("I I think the the point") == "I think the point"
+    assert clean_text("he said that that was very very good") == "he said that that was very very good"
+    assert clean_text("she had had enough") == "she had had enough"
+
+
+def test_single_word_boundary_overlap_is_kept():
+    texts = ["we went there and", "and then it rained"]
+    segments = [TranscriptSegment(text=text, start=float(i)) for i, text in enumerate(texts)]
+
+    cleaned, _ = clean_transcript(VideoTranscript(text=" ".join(texts), points=texts, segments=segments))
+
+    assert cleaned.text == "we went there and and then it rained"